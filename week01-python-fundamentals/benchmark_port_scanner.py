@@ -0,0 +1,347 @@
+"""
+Port Scanner Benchmark - Day 2, Session 1 (extension)
+Defense Application: Prove the async engine sweeps ranges fast without missing ports
+Runs a local listener farm on loopback (open ports plus "filtered" tarpits that
+never answer) and compares the sequential scan_port loop with the async engine
+(with and without the resume journal), fixed vs RTT-adaptive timeouts on a
+mostly filtered host, then sweeps many loopback hosts (127.0.0.x) at several
+socket budgets and fingerprints fake FTP/SSH/SMTP/POP3/HTTP services
+"""
+
+import asyncio
+import os
+import random
+import selectors
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import port_scanner
+
+LOOPBACK = "127.0.0.1"
+BASE_PORT = 20000      # Below the Linux ephemeral range, so probes never self-connect
+PORT_RANGE = 4000      # Ports scanned: BASE_PORT .. BASE_PORT + PORT_RANGE - 1
+OPEN_PORTS = 200       # Listeners that accept connections
+FILTERED_PORTS = 20    # Tarpits: full accept backlog, new SYNs are dropped -> timeout
+TIMEOUT = 1
+CONCURRENCY_LEVELS = [100, 500, 2000]
+FIREWALLED_HOST = "127.0.0.250"  # Mostly filtered: where fixed timeouts hurt most
+FIREWALLED_PORTS = 2000
+FIREWALLED_FILTERED = 1000
+SWEEP_HOSTS = 32        # 127.0.0.2 .. 127.0.0.33 (all of 127/8 is loopback on Linux)
+SWEEP_PORTS = 500       # Ports per host in the sweep
+SWEEP_BUDGETS = [64, 256, 1024]
+
+SERVICE_BASE = 30000     # Fake services for the fingerprinting stage live here
+SERVICE_RANGE = 3000
+
+# Fake services: (port, expected service, greeting sent on connect or None)
+FAKE_SERVICES = [
+    (30021, "FTP", b"220 (vsFTPd 3.0.5)\r\n"),
+    (30121, "FTP", b"220 Welcome to the records archive\r\n"),  # Needs the EHLO probe
+    (30022, "SSH", b"SSH-2.0-OpenSSH_8.9p1 Ubuntu-3ubuntu0.6\r\n"),
+    (30025, "SMTP", b"220 mail.defence.example.ng ESMTP Postfix\r\n"),
+    (30125, "SMTP", b"220 mail.defence.example.ng ready\r\n"),  # Needs the EHLO probe
+    (30110, "POP3", b"+OK Dovecot ready.\r\n"),
+    (32222, "HTTP", None),  # Web server on an SSH-looking port
+    (30999, "Unknown Service", None),  # Accepts and never says a word
+]
+
+# Simulated links for the RTT estimator: (name, mean RTT seconds, jitter seconds)
+SIMULATED_LINKS = [("LAN", 0.0005, 0.0002), ("Nigeria 4G", 0.08, 0.03),
+                   ("Satellite (VSAT)", 0.65, 0.15)]
+
+
+class ListenerFarm:
+    """Loopback listeners on random ports in the scan range"""
+
+    def __init__(self, open_count=OPEN_PORTS, filtered_count=FILTERED_PORTS, seed=7,
+                 host=LOOPBACK, port_range=PORT_RANGE):
+        self.open_ports = set()
+        self.filtered_ports = set()
+        self.sockets = []
+        self.fillers = []
+        self.selector = selectors.DefaultSelector()
+        self.stopping = False
+
+        candidates = list(range(BASE_PORT, BASE_PORT + port_range))
+        random.Random(seed).shuffle(candidates)
+        for port in candidates:
+            if len(self.open_ports) == open_count and len(self.filtered_ports) == filtered_count:
+                break
+            tarpit = len(self.filtered_ports) < filtered_count
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            try:
+                listener.bind((host, port))
+            except OSError:
+                listener.close()
+                continue  # Port already in use on this machine
+            self.sockets.append(listener)
+            if tarpit:
+                listener.listen(0)
+                filler = socket.create_connection((host, port))  # Fills the backlog
+                self.fillers.append(filler)
+                self.filtered_ports.add(port)
+            else:
+                listener.listen(128)
+                listener.setblocking(False)
+                self.selector.register(listener, selectors.EVENT_READ)
+                self.open_ports.add(port)
+
+        self.thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self.thread.start()
+
+    def _accept_loop(self):
+        while not self.stopping:
+            for key, _ in self.selector.select(timeout=0.1):
+                try:
+                    connection, _ = key.fileobj.accept()
+                    connection.close()
+                except OSError:
+                    pass
+
+    def close(self):
+        self.stopping = True
+        self.thread.join()
+        for sock in self.sockets + self.fillers:
+            sock.close()
+        self.selector.close()
+
+
+class ServiceFarm:
+    """Fake FTP/SSH/SMTP/POP3/HTTP servers on loopback (own event loop thread)"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.servers = []
+        for port, service, greeting in FAKE_SERVICES:
+            handler = self._handler(service, greeting)
+            self.servers.append(self.loop.run_until_complete(
+                asyncio.start_server(handler, LOOPBACK, port)))
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def _handler(service, greeting):
+        async def handle(reader, writer):
+            try:
+                if greeting:
+                    writer.write(greeting)
+                    await writer.drain()
+                request = await reader.readline()
+                if request.startswith(b"EHLO") and service == "SMTP":
+                    writer.write(b"250-mail.defence.example.ng\r\n250 SIZE 10240000\r\n")
+                elif request.startswith(b"EHLO"):
+                    writer.write(b"500 Unknown command.\r\n")
+                elif request.startswith(b"HEAD") and service == "HTTP":
+                    writer.write(b"HTTP/1.1 200 OK\r\nServer: nginx/1.18.0 (Ubuntu)\r\n\r\n")
+                await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                writer.close()
+        return handle
+
+    def close(self):
+        async def shutdown():
+            for server in self.servers:
+                server.close()
+                await server.wait_closed()
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def sequential_scan(ports, timeout=TIMEOUT):
+    """The original engine: one blocking connect_ex after another"""
+    return {port for port in ports if port_scanner.scan_port(LOOPBACK, port, timeout)}
+
+
+async def async_scan(ports, concurrency, adaptive=False, timeout=TIMEOUT, journal=None):
+    found = set()
+    async for port, is_open in port_scanner.scan_ports(LOOPBACK, ports, concurrency, timeout,
+                                                       adaptive, journal=journal):
+        if is_open:
+            found.add(port)
+    return found
+
+
+def journaled_scan(ports, concurrency):
+    """Scan with a resume journal in a scratch directory (measures journaling cost)"""
+    with tempfile.TemporaryDirectory() as scratch:
+        journal = port_scanner.ScanJournal(os.path.join(scratch, "scan.log"))
+        try:
+            return asyncio.run(async_scan(ports, concurrency, journal=journal))
+        finally:
+            journal.close()
+
+
+def filtered_benchmark(concurrency=500):
+    """A heavily firewalled host: fixed vs RTT-adaptive timeouts (same results expected)"""
+    farm = ListenerFarm(open_count=20, filtered_count=FIREWALLED_FILTERED, seed=3,
+                        host=FIREWALLED_HOST, port_range=FIREWALLED_PORTS)
+    ports = list(range(BASE_PORT, BASE_PORT + FIREWALLED_PORTS))
+    print(f"\nFirewalled host {FIREWALLED_HOST}: {len(ports)} ports, {len(farm.open_ports)} open, "
+          f"{len(farm.filtered_ports)} filtered\n")
+    print(f"{'Timeouts':22} | {'Seconds':>8} | {'Ports/s':>9} | {'Open found':>10} | Correct")
+    print("-" * 70)
+    try:
+        for adaptive in (False, True):
+            start = time.perf_counter()
+            found = set()
+
+            async def scan():
+                async for port, is_open in port_scanner.scan_ports(
+                        FIREWALLED_HOST, ports, concurrency, TIMEOUT, adaptive):
+                    if is_open:
+                        found.add(port)
+
+            asyncio.run(scan())
+            elapsed = time.perf_counter() - start
+            correct = "✓" if found == farm.open_ports else "❌"
+            name = "adaptive + 1 retry" if adaptive else f"fixed {TIMEOUT}s"
+            print(f"{name:22} | {elapsed:8.2f} | {len(ports) / elapsed:9,.0f} | "
+                  f"{len(found):10} | {correct}")
+    finally:
+        farm.close()
+
+
+async def async_sweep(hosts, ports, concurrency, per_host_limit, adaptive, timeout=TIMEOUT):
+    found = set()
+    async for host, port, is_open in port_scanner.scan_hosts(hosts, ports, concurrency,
+                                                             per_host_limit, timeout, adaptive):
+        if is_open:
+            found.add((host, port))
+    return found
+
+
+def sweep_benchmark():
+    """Many hosts: throughput should follow the socket budget, not the host count"""
+    hosts = [f"127.0.0.{i}" for i in range(2, 2 + SWEEP_HOSTS)]
+    ports = list(range(BASE_PORT, BASE_PORT + SWEEP_PORTS))
+    farms = [ListenerFarm(open_count=10, filtered_count=5, seed=i, host=host,
+                          port_range=SWEEP_PORTS) for i, host in enumerate(hosts)]
+    expected = {(farm_host, port) for farm_host, farm in zip(hosts, farms)
+                for port in farm.open_ports}
+    print(f"\nSweep: {len(hosts)} hosts x {len(ports)} ports, "
+          f"{len(expected)} open, {5 * len(hosts)} filtered\n")
+    print(f"{'Budget':22} | {'Seconds':>8} | {'Probes/s':>9} | {'Open found':>10} | Correct")
+    print("-" * 70)
+    try:
+        runs = [(budget, False) for budget in SWEEP_BUDGETS] + [(SWEEP_BUDGETS[-1], True)]
+        for budget, adaptive in runs:
+            start = time.perf_counter()
+            found = asyncio.run(async_sweep(hosts, ports, budget,
+                                            port_scanner.DEFAULT_PER_HOST_LIMIT, adaptive))
+            elapsed = time.perf_counter() - start
+            correct = "✓" if found == expected else "❌"
+            name = f"{budget} sockets, {'adaptive' if adaptive else 'fixed'}"
+            print(f"{name:22} | {elapsed:8.2f} | "
+                  f"{len(hosts) * len(ports) / elapsed:9,.0f} | {len(found):10} | {correct}")
+    finally:
+        for farm in farms:
+            farm.close()
+
+
+def fingerprint_benchmark(concurrency=500):
+    """The fingerprinting stage runs after the sweep: the sweep time must not change"""
+    farm = ServiceFarm()
+    ports = list(range(SERVICE_BASE, SERVICE_BASE + SERVICE_RANGE))
+    expected = {port: service for port, service, _ in FAKE_SERVICES}
+    cache = port_scanner.BannerCache(path=None)
+    print(f"\nFingerprinting: {len(ports)} ports, {len(FAKE_SERVICES)} fake services\n")
+    print(f"{'Stage':22} | {'Seconds':>8} | {'Ports':>9} | {'Identified':>10} | Correct")
+    print("-" * 70)
+
+    async def run():
+        start = time.perf_counter()
+        found = [port async for port, is_open in port_scanner.scan_ports(
+            LOOPBACK, ports, concurrency, TIMEOUT, adaptive=False) if is_open]
+        elapsed = time.perf_counter() - start
+        correct = "✓" if set(found) == set(expected) else "❌"
+        print(f"{'connect sweep':22} | {elapsed:8.2f} | {len(ports):9} | {'-':>10} | {correct}")
+
+        for name in ("banners (cold cache)", "banners (cached)"):
+            start = time.perf_counter()
+            fingerprints = await port_scanner.fingerprint_services(
+                [(LOOPBACK, port) for port in found], cache=cache)
+            elapsed = time.perf_counter() - start
+            identified = {port: fingerprints[LOOPBACK, port][0] for port in found}
+            correct = "✓" if identified == expected else "❌"
+            print(f"{name:22} | {elapsed:8.2f} | {len(found):9} | "
+                  f"{sum(service != 'Unknown Service' for service in identified.values()):10} | "
+                  f"{correct}")
+        return fingerprints
+
+    try:
+        fingerprints = asyncio.run(run())
+    finally:
+        farm.close()
+    for (_, port), (service, product, _) in sorted(fingerprints.items()):
+        print(f"  {port}: {port_scanner.describe_service(service, product)}")
+
+
+def simulate_links(samples=2000, seed=7):
+    """Feed the RTT estimator simulated answers: does the timeout track each link?"""
+    rng = random.Random(seed)
+    print(f"\n{'Simulated link':22} | {'SRTT':>9} | {'Timeout':>9} | Answers slower than timeout")
+    print("-" * 70)
+    for name, mean_rtt, jitter in SIMULATED_LINKS:
+        estimator = port_scanner.RttEstimator(TIMEOUT)
+        late = 0
+        for _ in range(samples):
+            rtt = max(0.0001, rng.gauss(mean_rtt, jitter))
+            if estimator.samples and rtt > estimator.timeout():
+                late += 1  # Would have needed a retry
+            estimator.sample(rtt)
+        print(f"{name:22} | {estimator.srtt * 1000:7.1f}ms | "
+              f"{estimator.timeout() * 1000:7.0f}ms | {late / samples:.2%}")
+
+
+def main():
+    """
+    Main program
+    """
+    skip_sequential = "--skip-sequential" in sys.argv
+    ports = list(range(BASE_PORT, BASE_PORT + PORT_RANGE))
+
+    print("=" * 70)
+    print("PORT SCANNER BENCHMARK - LOOPBACK LISTENER FARM")
+    print("=" * 70)
+    farm = ListenerFarm()
+    print(f"Ports {ports[0]}-{ports[-1]}: {len(farm.open_ports)} open, "
+          f"{len(farm.filtered_ports)} filtered (timeout {TIMEOUT}s)\n")
+
+    print(f"{'Engine':22} | {'Seconds':>8} | {'Ports/s':>9} | {'Open found':>10} | Correct")
+    print("-" * 70)
+    try:
+        runs = [] if skip_sequential else [("sequential", None)]
+        runs += [(f"async x{level}", level) for level in CONCURRENCY_LEVELS]
+        runs.append(("async x500 + journal", 500))
+        for name, concurrency in runs:
+            start = time.perf_counter()
+            if concurrency is None:
+                found = sequential_scan(ports)
+            elif name.endswith("journal"):
+                found = journaled_scan(ports, concurrency)
+            else:
+                found = asyncio.run(async_scan(ports, concurrency))
+            elapsed = time.perf_counter() - start
+            correct = "✓" if found == farm.open_ports else "❌"
+            print(f"{name:22} | {elapsed:8.2f} | {len(ports) / elapsed:9,.0f} | "
+                  f"{len(found):10} | {correct}")
+    finally:
+        farm.close()
+
+    filtered_benchmark()
+    sweep_benchmark()
+    fingerprint_benchmark()
+    simulate_links()
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
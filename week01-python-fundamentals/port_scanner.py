@@ -4,10 +4,23 @@ Defense Application: Network reconnaissance and vulnerability assessment
 Use Case: Scanning Nigerian government/corporate networks for unauthorized services
 """
 
+import asyncio
+import hashlib
+import ipaddress
+import json
+import os
+import re
 import socket 
 import sys
+import time
+from collections import deque
 from datetime import datetime
 
+try:
+    import resource  # Unix only - used to respect the open-file limit
+except ImportError:
+    resource = None
+
 # Common ports and their services
 COMMON_PORTS = {
     21: "FTP",
@@ -27,6 +40,37 @@ COMMON_PORTS = {
     8443: "HTTPS-Alt"
 }
 
+DEFAULT_CONCURRENCY = 500  # Connection attempts in flight at once (socket budget)
+DEFAULT_PER_HOST_LIMIT = 64  # Connection attempts in flight per host in a sweep
+MIN_TIMEOUT = 0.1          # Adaptive timeout bounds (seconds)
+MAX_TIMEOUT = 10.0
+DEFAULT_RETRIES = 1        # Extra attempts for a port that timed out (adaptive mode)
+PROGRESS_INTERVAL = 0.25   # Seconds between progress line updates
+JOURNAL_BATCH = 1000       # Completed probes buffered before a journal write
+JOURNAL_FLUSH_INTERVAL = 1.0  # ...or seconds since the last write, whichever comes first
+SCAN_RESULTS_FILE = "scan_results.json"  # Latest open ports per host, for change reports
+BANNER_CONCURRENCY = 50    # Open ports fingerprinted at once (after the sweep)
+BANNER_TIMEOUT = 3.0       # Seconds per fingerprint (connect + every exchange)
+GREETING_WAIT = 1.0        # Seconds to wait for a server that speaks first
+BANNER_BYTES = 2048        # Most bytes kept from each reply
+BANNER_CACHE_FILE = "banner_cache.json"
+BANNER_CACHE_TTL = 24 * 3600  # Seconds before a cached fingerprint is probed again
+
+# Service signatures, compiled once: (service, pattern). Matched in order against
+# the probe transcript; a named group "product" becomes the version string.
+SIGNATURES = [(service, re.compile(pattern, re.IGNORECASE | re.MULTILINE | re.DOTALL))
+              for service, pattern in [
+    ("SSH", r"^SSH-[\d.]+-(?P<product>\S+)"),
+    ("HTTP", r"^HTTP/\d\.\d \d{3}.*?^Server: *(?P<product>[^\r\n]+)"),
+    ("HTTP", r"^HTTP/\d\.\d \d{3}"),
+    ("FTP", r"^220[ -](?P<product>[^\r\n]*FTP[^\r\n]*)"),
+    ("SMTP", r"^220[ -](?P<product>[^\r\n]*SMTP[^\r\n]*)"),
+    ("SMTP", r"^220[ -](?P<product>[^\r\n]*).*^250[ -]"),  # Answered our EHLO
+    ("FTP", r"^220[ -](?P<product>[^\r\n]*).*^(?:500|502|530)[ -]"),  # Rejected EHLO
+    ("POP3", r"^\+OK(?P<product>[^\r\n]*)"),
+    ("IMAP", r"^\* OK(?P<product>[^\r\n]*)"),
+]]
+
 def scan_port(target_ip, port, timeout=1):
     """
     Scan a single port on the target IP
@@ -57,37 +101,576 @@ def scan_port(target_ip, port, timeout=1):
     return False 
          
      
+# 🔵 Async scanning engine (NEW CONCEPT: asyncio non-blocking connects)
+# Instead of waiting up to `timeout` for each port in turn, hundreds of
+# connects are in flight at once; a filtered port only costs one timeout slot.
+def max_concurrency(requested):
+    """Cap concurrency below the process's open-file limit (each probe is a socket)"""
+    if resource is None:
+        return max(1, requested)
+    soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    if soft_limit == resource.RLIM_INFINITY:
+        return max(1, requested)
+    return max(1, min(requested, soft_limit - 64))  # Leave room for files, stdio, etc.
+
+
+async def probe_port(target_ip, port, timeout=1):
+    """
+    One non-blocking connect attempt
+    Returns (state, rtt): state is "open", "closed" (refused), "filtered"
+    (no answer within timeout) or "unreachable"; rtt is the seconds until the
+    host answered, or None when it did not.
+    """
+    loop = asyncio.get_running_loop()
+    sock = None
+    try:
+        # Inside the try: running out of file descriptors (EMFILE) is an OSError too
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        start = time.perf_counter()
+        await asyncio.wait_for(loop.sock_connect(sock, (target_ip, port)), timeout)
+        return "open", time.perf_counter() - start
+    except ConnectionRefusedError:
+        return "closed", time.perf_counter() - start  # The RST is a full round trip too
+    except asyncio.TimeoutError:
+        return "filtered", None
+    except OSError:
+        return "unreachable", None
+    finally:
+        if sock is not None:
+            sock.close()
+
+
+async def scan_port_async(target_ip, port, timeout=1):
+    """
+    Non-blocking version of scan_port
+    Returns True if port is open, False otherwise (closed, filtered or unreachable)
+    """
+    state, _ = await probe_port(target_ip, port, timeout)
+    return state == "open"
+
+
+# 🔵 Adaptive timeouts (NEW CONCEPT: TCP-style RTT estimation, RFC 6298)
+class RttEstimator:
+    """
+    Smoothed round-trip time and its variance for one host
+    Every answer (open or refused) is a sample; timeouts are not (Karn's rule).
+    The connect timeout is SRTT + 4 * RTTVAR, so a LAN host is given a few
+    milliseconds and a satellite link a few seconds.
+    """
+
+    ALPHA = 1 / 8  # Gain for SRTT
+    BETA = 1 / 4   # Gain for RTTVAR
+    K = 4
+
+    def __init__(self, initial_timeout=1):
+        self.initial_timeout = initial_timeout  # Used until the first answer arrives
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+
+    def sample(self, rtt):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.samples += 1
+
+    def timeout(self):
+        if self.srtt is None:
+            return self.initial_timeout
+        return min(max(self.srtt + self.K * self.rttvar, MIN_TIMEOUT), MAX_TIMEOUT)
+
+
+async def probe_with_retries(target_ip, port, timeout=1, estimator=None, retries=0):
+    """
+    Probe a port, retrying when it times out
+    With an estimator the timeout follows the host's RTT and doubles on each
+    retry (exponential back-off); without one every attempt uses `timeout`.
+    Returns the final state ("open", "closed", "filtered" or "unreachable").
+    """
+    for attempt in range(retries + 1):
+        if estimator is None:
+            limit = timeout
+        else:
+            limit = min(estimator.timeout() * 2 ** attempt, MAX_TIMEOUT)
+        state, rtt = await probe_port(target_ip, port, limit)
+        if rtt is not None and estimator is not None:
+            estimator.sample(rtt)
+        if state != "filtered":
+            break
+    return state
+
+
+# 🔵 Multi-host scheduling (NEW CONCEPT: interleaved work queue)
+class HostScheduler:
+    """
+    Hands out (host, port) probes round-robin across hosts
+    Consecutive probes go to different hosts, and no host ever has more than
+    per_host_limit probes in flight, so a subnet sweep never hammers one
+    machine while the global socket budget stays fully used.
+    """
+
+    def __init__(self, hosts, ports, per_host_limit, done=None):
+        done = done or {}
+        # Hosts resumed from a journal only get the ports they still need
+        self.ports = {host: [port for port in ports if port not in done[host]]
+                      if done.get(host) else ports for host in hosts}
+        self.per_host_limit = max(1, per_host_limit)
+        self.next_index = {host: 0 for host in hosts}  # Next port to probe per host
+        self.in_flight = {host: 0 for host in hosts}
+        self.ready = deque(host for host in hosts if self.ports[host])  # Can take a probe
+        self.unassigned_hosts = len(self.ready)  # Hosts with ports still to hand out
+
+    def take(self):
+        """Next (host, port), or None if every host with work is at its limit"""
+        if not self.ready:
+            return None
+        host = self.ready.popleft()
+        port = self.ports[host][self.next_index[host]]
+        self.next_index[host] += 1
+        self.in_flight[host] += 1
+        if self.next_index[host] == len(self.ports[host]):
+            self.unassigned_hosts -= 1
+        elif self.in_flight[host] < self.per_host_limit:
+            self.ready.append(host)  # Back of the line: other hosts go first
+        return host, port
+
+    def finish(self, host):
+        """A probe for host completed; it may take work again"""
+        self.in_flight[host] -= 1
+        if (self.in_flight[host] == self.per_host_limit - 1
+                and self.next_index[host] < len(self.ports[host])):
+            self.ready.append(host)  # Was saturated
+
+    @property
+    def all_assigned(self):
+        return self.unassigned_hosts == 0
+
+
+async def scan_hosts(hosts, ports, concurrency=DEFAULT_CONCURRENCY,
+                     per_host_limit=DEFAULT_PER_HOST_LIMIT, timeout=1, adaptive=True,
+                     retries=None, rtt_estimators=None, journal=None):
+    """
+    Yield (host, port, is_open) for every probe as soon as it finishes
+    A fixed pool of `concurrency` workers (the socket budget) pulls probes from
+    a HostScheduler, so throughput depends on the budget, not the host count.
+    adaptive=True sizes each host's timeouts from its RTT (timeout is only the
+    starting value); adaptive=False uses the fixed timeout like scan_port.
+    retries defaults to DEFAULT_RETRIES when adaptive, else 0. Pass a dict as
+    rtt_estimators to read the per-host RttEstimator objects afterwards.
+    With a ScanJournal, probes it already holds are skipped (not yielded) and
+    every finished probe is recorded in it.
+    """
+    ports = list(ports)
+    if retries is None:
+        retries = DEFAULT_RETRIES if adaptive else 0
+    estimators = {} if rtt_estimators is None else rtt_estimators
+    scheduler = HostScheduler(hosts, ports, per_host_limit,
+                              journal.completed if journal is not None else None)
+    changed = asyncio.Condition()
+    results = asyncio.Queue()
+
+    async def worker():
+        try:
+            while True:
+                async with changed:
+                    probe = scheduler.take()
+                    while probe is None and not scheduler.all_assigned:
+                        await changed.wait()
+                        probe = scheduler.take()
+                if probe is None:
+                    return
+                host, port = probe
+                estimator = None
+                if adaptive:
+                    estimator = estimators.get(host)
+                    if estimator is None:
+                        estimator = estimators[host] = RttEstimator(timeout)
+                try:
+                    state = await probe_with_retries(host, port, timeout, estimator, retries)
+                finally:
+                    async with changed:
+                        scheduler.finish(host)
+                        if scheduler.all_assigned:
+                            changed.notify_all()  # Let idle workers exit
+                        else:
+                            changed.notify()
+                if journal is not None:
+                    journal.record(host, port, state)
+                await results.put((host, port, state == "open"))
+        finally:
+            await results.put(None)  # This worker is done
+
+    total_probes = sum(len(host_ports) for host_ports in scheduler.ports.values())
+    worker_count = max(1, min(max_concurrency(concurrency), total_probes))
+    workers = [asyncio.create_task(worker()) for _ in range(worker_count)]
+    try:
+        remaining = len(workers)
+        while remaining:
+            item = await results.get()
+            if item is None:
+                remaining -= 1
+            else:
+                yield item
+    finally:
+        for task in workers:  # Consumer stopped early (Ctrl-C, break...)
+            task.cancel()
+        outcomes = await asyncio.gather(*workers, return_exceptions=True)
+    # A worker that crashed left its probes unreported - don't pass that off as a full scan
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            raise outcome
+
+
+async def scan_ports(target_ip, ports, concurrency=DEFAULT_CONCURRENCY, timeout=1,
+                     adaptive=True, retries=None, rtt_estimators=None, journal=None):
+    """
+    Yield (port, is_open) for every port of one host as soon as its probe finishes
+    At most `concurrency` sockets are open at any moment however many ports are
+    scanned. See scan_hosts for adaptive/retries/journal.
+    """
+    async for _, port, is_open in scan_hosts([target_ip], ports, concurrency, concurrency,
+                                             timeout, adaptive, retries, rtt_estimators,
+                                             journal):
+        yield port, is_open
+
+
+# 🔵 Resumable scans (NEW CONCEPT: append-only journal)
+class ScanJournal:
+    """
+    Append-only log of finished probes, one "host port state" line each
+    Lines are buffered and written in batches (every JOURNAL_BATCH probes or
+    JOURNAL_FLUSH_INTERVAL seconds), so journaling costs almost nothing per
+    probe. After Ctrl-C or a crash, opening the same file again loads what was
+    done, and scan_hosts skips it: only the last unwritten batch is re-probed.
+    """
+
+    def __init__(self, path, batch_size=JOURNAL_BATCH):
+        self.path = path
+        self.batch_size = batch_size
+        self.completed = {}  # host -> set of ports already probed
+        self.open_ports = {}  # host -> set of ports found open
+        self.pending = []
+        self.last_write = time.perf_counter()
+
+        needs_newline = False
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    needs_newline = not line.endswith("\n")
+                    fields = line.split()
+                    if line.startswith("#") or len(fields) != 3 or needs_newline:
+                        continue  # Header, or a line cut short by a crash
+                    host, port, state = fields
+                    self._remember(host, int(port), state)
+        self.file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self.file.write("\n")  # Don't glue new entries onto a torn line
+
+    def _remember(self, host, port, state):
+        self.completed.setdefault(host, set()).add(port)
+        if state == "open":
+            self.open_ports.setdefault(host, set()).add(port)
+
+    @property
+    def done(self):
+        """Number of probes already recorded"""
+        return sum(len(ports) for ports in self.completed.values())
+
+    def write_header(self, text):
+        if not self.done and not self.pending:
+            self.file.write(f"# {text}\n")
+
+    def record(self, host, port, state):
+        self._remember(host, port, state)
+        self.pending.append(f"{host} {port} {state}\n")
+        if (len(self.pending) >= self.batch_size
+                or time.perf_counter() - self.last_write >= JOURNAL_FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.file.write("".join(self.pending))
+            self.pending = []
+        self.file.flush()
+        self.last_write = time.perf_counter()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def discard(self):
+        """The scan finished: the journal is no longer needed"""
+        if not self.file.closed:
+            self.file.close()
+        os.remove(self.path)
+
+
+def journal_path(hosts, ports):
+    """Journal file name for this exact scan (same hosts and ports -> same file)"""
+    key = f"{','.join(hosts)}|{format_port_ranges(ports)}"
+    return f"scan_journal_{hashlib.sha1(key.encode()).hexdigest()[:12]}.log"
+
+
+def format_port_ranges(ports):
+    """Compact a port list: [1, 2, 3, 80] -> 1-3,80"""
+    ranges = []
+    for port in sorted(set(ports)):
+        if ranges and port == ranges[-1][1] + 1:
+            ranges[-1][1] = port
+        else:
+            ranges.append([port, port])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def parse_port_ranges(text):
+    """Inverse of format_port_ranges: 1-3,80 -> [1, 2, 3, 80]"""
+    ports = []
+    for part in filter(None, text.split(",")):
+        first, _, last = part.partition("-")
+        ports += range(int(first), int(last or first) + 1)
+    return ports
+
+
+def resolve_targets(spec):
+    """
+    Expand a target specification into a list of IPv4 addresses
+    Accepts comma/space separated hostnames, IPs and CIDR ranges
+    (e.g. "10.0.0.0/24, mail.example.ng"); "@hosts.txt" reads one entry per line.
+    Raises ValueError for entries that cannot be resolved.
+    """
+    entries = []
+    for item in spec.replace(',', ' ').split():
+        if item.startswith('@'):
+            with open(item[1:], encoding="utf-8") as f:
+                entries += [line.split('#')[0].strip() for line in f]
+        else:
+            entries.append(item)
+
+    hosts = []
+    for entry in filter(None, entries):
+        if '/' in entry:
+            network = ipaddress.ip_network(entry, strict=False)
+            if network.version != 4:
+                raise ValueError(f"Only IPv4 ranges are supported: {entry}")
+            # hosts() skips network/broadcast addresses; a /32 is the single host
+            hosts += [str(ip) for ip in network.hosts()] or [str(network.network_address)]
+        else:
+            try:
+                hosts.append(socket.gethostbyname(entry))
+            except socket.gaierror:
+                raise ValueError(f"Could not resolve {entry}")
+    return list(dict.fromkeys(hosts))  # Drop duplicates, keep order
+
+
 def get_service_name(port):
     """
     Get the common service name for a port
     """
     return COMMON_PORTS.get(port, "Unknown Service")
 
-def scan_target(target_ip, ports_to_scan):
+# 🔵 Service fingerprinting (NEW CONCEPT: banner grabbing + signature matching)
+# A separate stage that only visits ports the sweep found open, so the connect
+# sweep itself runs exactly as fast with or without it.
+class BannerCache:
+    """
+    Fingerprints per (host, port), reused until they are ttl seconds old
+    Kept in a JSON file, so repeated scans of the same network skip ports that
+    were fingerprinted recently. path=None keeps the cache in memory only.
+    """
+
+    def __init__(self, path=BANNER_CACHE_FILE, ttl=BANNER_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def get(self, host, port):
+        entry = self.entries.get(f"{host}:{port}")
+        if entry is None or time.time() - entry["time"] > self.ttl:
+            return None
+        return entry
+
+    def put(self, host, port, service, product, banner):
+        self.entries[f"{host}:{port}"] = {"time": time.time(), "service": service,
+                                          "product": product, "banner": banner}
+
+    def save(self):
+        if not self.path:
+            return
+        now = time.time()
+        live = {key: entry for key, entry in self.entries.items()
+                if now - entry["time"] <= self.ttl}
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(live, f, indent=2)
+        os.replace(temporary, self.path)
+
+
+def identify_service(transcript):
+    """Match a probe transcript against SIGNATURES: returns (service, product) or None"""
+    for service, pattern in SIGNATURES:
+        match = pattern.search(transcript)
+        if match:
+            product = (match.groupdict().get("product") or "").strip()
+            if product.startswith("(") and product.endswith(")"):
+                product = product[1:-1]  # "220 (vsFTPd 3.0.5)"
+            return service, product
+    return None
+
+
+async def _read_reply(reader, timeout):
+    """Whatever the server sends within timeout (empty string if nothing)"""
+    try:
+        data = await asyncio.wait_for(reader.read(BANNER_BYTES), timeout)
+    except asyncio.TimeoutError:
+        return ""
+    return data.decode("latin-1")
+
+
+async def grab_banner(host, port, timeout=BANNER_TIMEOUT):
+    """
+    Read a service's banner, sending light probes when it stays silent
+    SSH, FTP, SMTP, POP3 and IMAP servers greet first. A 220 greeting that
+    could be FTP or SMTP gets an EHLO (SMTP answers 250, FTP rejects it); a
+    silent server gets an HTTP HEAD request. Returns the transcript of replies.
+    """
+    async def exchange():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            transcript = await _read_reply(reader, GREETING_WAIT)
+            if transcript.startswith("220") and identify_service(transcript) is None:
+                writer.write(b"EHLO scanner.local\r\n")
+                await writer.drain()
+                transcript += await _read_reply(reader, GREETING_WAIT)
+            elif not transcript:
+                writer.write(f"HEAD / HTTP/1.0\r\nHost: {host}\r\n\r\n".encode())
+                await writer.drain()
+                transcript = await _read_reply(reader, GREETING_WAIT)
+            return transcript[:BANNER_BYTES]
+        finally:
+            writer.close()
+
+    try:
+        return await asyncio.wait_for(exchange(), timeout)
+    except (asyncio.TimeoutError, OSError):
+        return ""
+
+
+async def fingerprint_services(targets, concurrency=BANNER_CONCURRENCY, cache=None):
+    """
+    Identify the services behind open (host, port) pairs concurrently
+    Returns {(host, port): (service, product, banner)}; service falls back to
+    the COMMON_PORTS name when nothing matched. Fresh cache entries are used
+    without connecting; new results with a banner are stored in the cache.
+    """
+    limit = asyncio.Semaphore(max_concurrency(concurrency))
+
+    async def fingerprint(host, port):
+        cached = cache.get(host, port) if cache is not None else None
+        if cached is not None:
+            return cached["service"], cached["product"], cached["banner"]
+        async with limit:
+            banner = await grab_banner(host, port)
+        service, product = identify_service(banner) or (get_service_name(port), "")
+        if cache is not None and banner.strip():
+            # An empty transcript (timeout, service slow to start) is retried next scan
+            cache.put(host, port, service, product, banner)
+        return service, product, banner
+
+    targets = list(targets)
+    results = await asyncio.gather(*(fingerprint(host, port) for host, port in targets))
+    return dict(zip(targets, results))
+
+
+async def identify_open_ports(results, cache=None):
+    """
+    Second scan stage: replace port-number guesses in {host: [(port, service)]}
+    with fingerprinted service names (in place); returns results
+    """
+    targets = [(host, port) for host, open_ports in results.items() for port, _ in open_ports]
+    if not targets:
+        return results
+    print(f"Fingerprinting {len(targets)} open port(s)...")
+    start = time.perf_counter()
+    fingerprints = await fingerprint_services(targets, cache=cache)
+    for host, open_ports in results.items():
+        open_ports[:] = [(port, describe_service(*fingerprints[host, port][:2]))
+                         for port, _ in open_ports]
+    print(f"✓ Fingerprinting done in {time.perf_counter() - start:.1f}s\n")
+    return results
+
+
+def describe_service(service, product):
+    """Display name for a fingerprinted service, e.g. SSH (OpenSSH_8.9p1)"""
+    return f"{service} ({product})" if product else service
+
+
+def scan_target(target_ip, ports_to_scan, concurrency=DEFAULT_CONCURRENCY, timeout=1,
+                adaptive=True, journal=None, fingerprint=False, banner_cache=None):
     """
     Scan multiple ports on a target
     """
+    return asyncio.run(scan_target_async(target_ip, ports_to_scan, concurrency, timeout, adaptive,
+                                          journal, fingerprint, banner_cache))
+
+
+async def scan_target_async(target_ip, ports_to_scan, concurrency=DEFAULT_CONCURRENCY, timeout=1,
+                            adaptive=True, journal=None, fingerprint=False, banner_cache=None):
+    """
+    Scan multiple ports on a target concurrently
+    Open ports are printed the moment they are found. With a journal, ports it
+    already holds are not probed again and its open ports are included.
+    fingerprint=True identifies the services on open ports once the sweep is
+    done (see fingerprint_services).
+    """
     print("=" * 70)
     print(f"NETWORK PORT SCANNER - DEFENSE SECURITY TOOL")
     print("=" * 70)
-    print("=Target: {target_ip}")
-    print(f"scan started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Target: {target_ip}")
+    print(f"Scan started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Ports: {len(ports_to_scan):,} | Concurrency: {max_concurrency(concurrency)}")
     print(f"=" * 70)
     print()
 
     open_ports = []
+    scanned = 0
+    if journal is not None and journal.done:
+        open_ports = [(port, get_service_name(port))
+                      for port in sorted(journal.open_ports.get(target_ip, ()))]
+        scanned = len(journal.completed.get(target_ip, ()))
+        print(f"↻ Resuming: {scanned:,} ports already scanned, {len(open_ports)} open\n")
 
     print("Scanning in progress...\n")
 
-    for port in ports_to_scan:
-        sys.stdout.write(f"\rScanning port {port}...")
-        sys.stdout.flush()
-
-        if scan_port(target_ip, port):
+    start = time.perf_counter()
+    next_progress = start
+    estimators = {}
+    async for port, is_open in scan_ports(target_ip, ports_to_scan, concurrency, timeout,
+                                          adaptive, rtt_estimators=estimators, journal=journal):
+        scanned += 1
+        if is_open:
             service = get_service_name(port)
             open_ports.append((port, service))
-            print(f"\r[OPEN] Port {port}: {service}")
+            print(f"\r[OPEN] Port {port}: {service} ({assess_risk(port)})" + " " * 20)
+
+        now = time.perf_counter()
+        if now >= next_progress or scanned == len(ports_to_scan):
+            rate = scanned / max(now - start, 1e-9)
+            sys.stdout.write(f"\rScanned {scanned:,}/{len(ports_to_scan):,} ports "
+                             f"({rate:,.0f} ports/s)")
+            sys.stdout.flush()
+            next_progress = now + PROGRESS_INTERVAL
     print("\n")
+
+    open_ports.sort()
+    if fingerprint:
+        await identify_open_ports({target_ip: open_ports}, banner_cache)
     print("=" * 70)
     print("SCAN RESULTS")
     print("=" * 70)
@@ -100,12 +683,104 @@ def scan_target(target_ip, ports_to_scan):
     else: 
         print("\nNo open ports found in the scanned range.")
 
+    estimator = estimators.get(target_ip)
+    if estimator is not None and estimator.samples:
+        print(f"\nRound trip: {estimator.srtt * 1000:.1f}ms (±{estimator.rttvar * 1000:.1f}ms), "
+              f"connect timeout {estimator.timeout() * 1000:.0f}ms")
+
     print("\n" + "=" * 70)
-    print("Scan completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S)}")
+    print(f"Scan completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} "
+          f"({time.perf_counter() - start:.1f}s)")
     print("=" * 70)
 
     return open_ports
 
+
+def scan_network(hosts, ports_to_scan, concurrency=DEFAULT_CONCURRENCY,
+                 per_host_limit=DEFAULT_PER_HOST_LIMIT, timeout=1, adaptive=True, journal=None,
+                 fingerprint=False, banner_cache=None):
+    """
+    Scan the same ports on many hosts (a subnet sweep)
+    Returns {host: [(port, service), ...]} for hosts with open ports
+    """
+    return asyncio.run(scan_network_async(hosts, ports_to_scan, concurrency, per_host_limit,
+                                          timeout, adaptive, journal, fingerprint, banner_cache))
+
+
+async def scan_network_async(hosts, ports_to_scan, concurrency=DEFAULT_CONCURRENCY,
+                             per_host_limit=DEFAULT_PER_HOST_LIMIT, timeout=1, adaptive=True,
+                             journal=None, fingerprint=False, banner_cache=None):
+    """
+    Scan many hosts concurrently, interleaving hosts and ports
+    Open ports are printed the moment they are found (see scan_target_async
+    for journal and fingerprint)
+    """
+    total = len(hosts) * len(ports_to_scan)
+    print("=" * 70)
+    print(f"NETWORK SWEEP - DEFENSE SECURITY TOOL")
+    print("=" * 70)
+    print(f"Targets: {len(hosts):,} hosts ({hosts[0]} ... {hosts[-1]})")
+    print(f"Scan started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Ports per host: {len(ports_to_scan):,} | Concurrency: {max_concurrency(concurrency)} "
+          f"(max {per_host_limit} per host)")
+    print(f"=" * 70)
+    print()
+
+    results = {}
+    scanned = 0
+    if journal is not None and journal.done:
+        targets = set(hosts)
+        for host, open_ports in journal.open_ports.items():
+            if host in targets:
+                results[host] = [(port, get_service_name(port)) for port in open_ports]
+        scanned = sum(len(ports) for host, ports in journal.completed.items() if host in targets)
+        print(f"↻ Resuming: {scanned:,} probes already done, "
+              f"{sum(map(len, results.values()))} open port(s) found so far\n")
+
+    start = time.perf_counter()
+    next_progress = start
+    estimators = {}
+    async for host, port, is_open in scan_hosts(hosts, ports_to_scan, concurrency,
+                                                per_host_limit, timeout, adaptive,
+                                                rtt_estimators=estimators, journal=journal):
+        scanned += 1
+        if is_open:
+            service = get_service_name(port)
+            results.setdefault(host, []).append((port, service))
+            print(f"\r[OPEN] {host}:{port} {service} ({assess_risk(port)})" + " " * 20)
+
+        now = time.perf_counter()
+        if now >= next_progress or scanned == total:
+            rate = scanned / max(now - start, 1e-9)
+            sys.stdout.write(f"\rProbed {scanned:,}/{total:,} ({rate:,.0f} probes/s)")
+            sys.stdout.flush()
+            next_progress = now + PROGRESS_INTERVAL
+    print("\n")
+
+    for open_ports in results.values():
+        open_ports.sort()
+    if fingerprint:
+        await identify_open_ports(results, banner_cache)
+    print("=" * 70)
+    print("SWEEP RESULTS")
+    print("=" * 70)
+    for host in sorted(results, key=ipaddress.ip_address):
+        estimator = estimators.get(host)
+        rtt = (f" (rtt {estimator.srtt * 1000:.1f}ms)"
+               if estimator is not None and estimator.samples else "")
+        print(f"\n{host}: {len(results[host])} open port(s){rtt}")
+        for port, service in results[host]:
+            print(f" Port {port:5} | {service:15} | Risk {assess_risk(port)}")
+    print(f"\n{len(results)} of {len(hosts)} host(s) with open ports")
+
+    print("\n" + "=" * 70)
+    print(f"Sweep completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} "
+          f"({time.perf_counter() - start:.1f}s)")
+    print("=" * 70)
+
+    return results
+
+
 def assess_risk(port):
     """
     Assess security risk level of an open port
@@ -139,6 +814,75 @@ def save_scan_report(target_ip, open_ports, filename="scan_report.txt"):
             report.write("No open ports detected.\n")
         
         report.write(f"\n{'=' * 70}\n")
+
+
+# 🔵 Change reports (NEW CONCEPT: diff against the previous scan)
+def save_scan_results(hosts, ports, results, filename=SCAN_RESULTS_FILE):
+    """
+    Record the latest open ports of every scanned host in a JSON file
+    results is {host: [(port, service), ...]} (silent hosts may be missing);
+    ports outside this scan keep what an earlier scan found.
+    Returns {host: (opened, closed)} for hosts whose open ports changed since
+    their previous entry; only ports covered by both scans are compared, and
+    hosts seen for the first time are not reported.
+    """
+    try:
+        with open(filename, encoding="utf-8") as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        saved = {"hosts": {}}
+
+    port_set = set(ports)
+    scanned_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    changes = {}
+    for host in hosts:
+        open_now = {port: service for port, service in results.get(host, [])}
+        previous = saved["hosts"].get(host)
+        if previous is None:
+            known_ports = port_set
+        else:
+            known_ports = set(parse_port_ranges(previous["ports"]))
+            open_before = {int(port) for port in previous["open"]}
+            overlap = known_ports & port_set
+            opened = sorted(port for port in open_now if port in overlap - open_before)
+            closed = sorted(port for port in open_before & overlap if port not in open_now)
+            if opened or closed:
+                changes[host] = (opened, closed)
+            # Ports outside this scan keep their last known state
+            for port, service in previous["open"].items():
+                if int(port) not in port_set:
+                    open_now[int(port)] = service
+            known_ports |= port_set
+        saved["hosts"][host] = {"scanned_at": scanned_at,
+                                "ports": format_port_ranges(known_ports),
+                                "open": {str(port): service
+                                         for port, service in sorted(open_now.items())}}
+
+    # Write a new file and swap it in, so an interrupted save never loses history
+    temporary = f"{filename}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(saved, f, indent=2)
+    os.replace(temporary, filename)
+    return changes
+
+
+def print_changes(changes):
+    """Show what changed since the previous scan of each host"""
+    print("\n" + "=" * 70)
+    print("CHANGES SINCE LAST SCAN")
+    print("=" * 70)
+    if not changes:
+        print("\nNo changes on previously scanned hosts.")
+    for host in sorted(changes, key=ipaddress.ip_address):
+        opened, closed = changes[host]
+        print(f"\n{host}:")
+        for port in opened:
+            print(f" [NEW]    Port {port:5} | {get_service_name(port):15} | Risk {assess_risk(port)}")
+        for port in closed:
+            print(f" [CLOSED] Port {port:5} | {get_service_name(port):15}")
+    print("=" * 70)
+
+
 def main():
     """
     Main program
@@ -146,27 +890,32 @@ def main():
     
     print("\n🛡️  DEFENSE PORT SCANNER v1.0\n")
 
-    # Get target from user
-    target = input("Enter target IP address or hostname (e.g., scanme.nmap.org): ").strip()
+    # Get target(s) from user
+    target = input("Enter target IP, hostname, CIDR range or list "
+                   "(e.g., scanme.nmap.org, 192.168.1.0/24, @hosts.txt): ").strip()
 
     if not target:
         print("Error: No target specified!")
         return
-   # Resolve hostname to IP
+   # Resolve hostnames and expand ranges to IPs
     try:
-        target_ip = socket.gethostbyname(target)
-        print(f"Resolved {target} to {target_ip}\n")
-    except socket.gaierror:
-        print(f"Error: Could not resolve {target}")
+        hosts = resolve_targets(target)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}")
+        return
+    if not hosts:
+        print("Error: No hosts in the target specification!")
         return
+    print(f"Resolved {target} to {hosts[0] if len(hosts) == 1 else f'{len(hosts):,} hosts'}\n")
     
     # Choose scan type
     print("Scan Options:")
     print("1. Quick Scan (Common 15 ports)")
     print("2. Standard Scan (Top 100 ports)")
     print("3. Custom Port Range")
+    print("4. Full Scan (all 65,535 ports)")
     
-    choice = input("\nSelect scan type (1-3): ").strip()
+    choice = input("\nSelect scan type (1-4): ").strip()
     
     if choice == "1":
         ports = list(COMMON_PORTS.keys())
@@ -177,18 +926,57 @@ def main():
         start = int(input("Start port: "))
         end = int(input("End port: "))
         ports = list(range(start, end + 1))
+    elif choice == "4":
+        ports = list(range(1, 65536))
     else:
         print("Invalid choice!")
         return
     
+    # Optional second stage: identify services from their banners
+    fingerprint = input("Identify services on open ports (banner grab)? (y/n): ").strip().lower() == 'y'
+    banner_cache = BannerCache() if fingerprint else None
+
+    # Resume an interrupted run of the same scan, if there is one
+    journal_file = journal_path(hosts, ports)
+    journal = ScanJournal(journal_file)
+    if journal.done:
+        answer = input(f"\nFound an interrupted scan ({journal.done:,} of "
+                       f"{len(hosts) * len(ports):,} probes done). Resume? (y/n): ")
+        if answer.strip().lower() != 'y':
+            journal.discard()
+            journal = ScanJournal(journal_file)
+    journal.write_header(f"{target} | {len(hosts)} host(s) x {len(ports)} port(s)")
+
     # Perform scan
-    open_ports = scan_target(target_ip, ports)
+    try:
+        if len(hosts) == 1:
+            results = {hosts[0]: scan_target(hosts[0], ports, journal=journal,
+                                             fingerprint=fingerprint, banner_cache=banner_cache)}
+        else:
+            results = scan_network(hosts, ports, journal=journal, fingerprint=fingerprint,
+                                   banner_cache=banner_cache)
+    except KeyboardInterrupt:
+        journal.close()
+        if banner_cache is not None:
+            banner_cache.save()
+        print(f"\n\nScan interrupted - progress saved to {journal_file}")
+        print("Run the same scan again to resume where it stopped.")
+        return
+    journal.discard()
+    if banner_cache is not None:
+        banner_cache.save()
+
+    # Report what changed since the last scan of these hosts
+    changes = save_scan_results(hosts, ports, results)
+    print_changes(changes)
+    print(f"✓ Results saved to {SCAN_RESULTS_FILE}")
     
-    # Save report
+    # Save report (one section per host; silent hosts in a sweep are skipped)
     save_report = input("\nSave report to file? (y/n): ").strip().lower()
     if save_report == 'y':
-        save_scan_report(target_ip, open_ports)
-        print("✓ Report saved to scan_report.txt")
+        for host, open_ports in results.items():
+            save_scan_report(host, open_ports)
+        print(f"✓ Report saved to scan_report.txt ({len(results)} host(s))")
 
 
 if __name__ == "__main__":
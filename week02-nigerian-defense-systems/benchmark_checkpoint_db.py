@@ -0,0 +1,361 @@
+"""
+National-Scale Benchmark - Checkpoint Database
+Defense Application: Measure every checkpoint_system change at national data volumes
+Generates a synthetic database (millions of vehicles, hundreds of thousands of
+wanted persons, tens of millions of log entries), then replays a realistic mix
+of plate checks, searches and log writes at increasing concurrency
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import bulk_import
+import checkpoint_metrics
+import checkpoint_system
+
+DEFAULT_DB = 'benchmark_national.db'
+
+# Row counts at --scale 1.0
+NATIONAL_SCALE = {
+    'vehicles': 5_000_000,
+    'stolen_vehicles': 50_000,
+    'wanted_persons': 200_000,
+    'logs': 20_000_000,
+}
+LOG_MONTHS = 12          # Generated logs cover this many months up to now
+CHECKPOINTS = 500        # Distinct checkpoint posts in the generated logs
+LOG_BATCH_ROWS = 100_000
+
+STATE_CODES = ['ABJ', 'ABI', 'ADA', 'AKW', 'ANA', 'BAU', 'BAY', 'BEN', 'BOR', 'CRS', 'DEL',
+               'EBO', 'EDO', 'EKI', 'ENU', 'GOM', 'IMO', 'JIG', 'KAD', 'KAN', 'KAT', 'KEB',
+               'KOG', 'KWA', 'LAG', 'NAS', 'NIG', 'OGU', 'OND', 'OSU', 'OYO', 'PLA', 'RIV',
+               'SOK', 'TAR', 'YOB', 'ZAM']
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+FIRST_NAMES = ['Musa', 'Sani', 'Ibrahim', 'Usman', 'Hassan', 'Adewale', 'Chidi', 'Emeka', 'Tunde',
+               'Bello', 'Yakubu', 'Abdullahi', 'Kabiru', 'Segun', 'Femi', 'Ikenna', 'Obinna',
+               'Aliyu', 'Garba', 'Danjuma', 'Amina', 'Fatima', 'Blessing', 'Ngozi', 'Aisha',
+               'Halima', 'Chioma', 'Funke', 'Zainab', 'Hadiza']
+LAST_NAMES = ['Abubakar', 'Garba', 'Mohammed', 'Suleiman', 'Lawal', 'Johnson', 'Okafor', 'Nwosu',
+              'Adeyemi', 'Bello', 'Yusuf', 'Eze', 'Musa', 'Danladi', 'Okeke', 'Ibrahim', 'Adamu',
+              'Balogun', 'Okonkwo', 'Ogunleye', 'Umar', 'Salisu', 'Nnamdi', 'Olawale', 'Idris',
+              'Chukwu', 'Akande', 'Shehu', 'Onyeka', 'Babangida']
+MAKES = [('Toyota', 'Corolla'), ('Toyota', 'Camry'), ('Toyota', 'Hilux'), ('Honda', 'Accord'),
+         ('Honda', 'Civic'), ('Nissan', 'Pathfinder'), ('Lexus', 'RX350'), ('Ford', 'Explorer'),
+         ('Hyundai', 'Elantra'), ('Mercedes', 'C-Class'), ('Peugeot', '406'), ('Kia', 'Rio')]
+COLORS = ['Silver', 'Black', 'White', 'Blue', 'Gray', 'Red', 'Green']
+CRIMES = ['Kidnapping', 'Armed Robbery', 'Banditry', 'Terrorism', 'Cattle Rustling', 'Fraud']
+
+# Share of each operation in the replayed traffic (a plate check is usually logged)
+MIX = [('plate_check', 0.60), ('log_write', 0.25), ('name_search', 0.07), ('id_search', 0.08)]
+SAMPLE_SIZE = 20_000     # Keys drawn from the database to build the workload
+
+
+def plate_for(index):
+    """Distinct plate for every index below ~22 million ('LAG-123-AB' style)"""
+    state = STATE_CODES[index % len(STATE_CODES)]
+    rest = index // len(STATE_CODES)
+    pair = rest // 900
+    return f"{state}-{100 + rest % 900}-{LETTERS[pair // 26 % 26]}{LETTERS[pair % 26]}"
+
+
+def random_phone(rng):
+    return f"0{rng.choice('789')}0{rng.randrange(10 ** 8):08d}"
+
+
+def random_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+# 🔵 Synthetic data (generators - nothing is held in memory)
+def generate_vehicles(count, rng):
+    for i in range(count):
+        make, model = rng.choice(MAKES)
+        yield (plate_for(i), random_name(rng), random_phone(rng), make, model, rng.choice(COLORS),
+               f"{rng.randint(2005, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+               STATE_CODES[i % len(STATE_CODES)],
+               'Suspended' if rng.random() < 0.02 else 'Active')
+
+
+def generate_stolen(count, vehicle_count, rng):
+    for i in range(count):
+        # Most stolen cars are registered; some plates are fake or foreign
+        index = rng.randrange(vehicle_count) if rng.random() < 0.8 else vehicle_count + i
+        make, model = rng.choice(MAKES)
+        yield (plate_for(index), make, model, rng.choice(COLORS),
+               f"{rng.randint(2015, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+               f"{rng.choice(STATE_CODES)} highway", random_name(rng), random_phone(rng),
+               f"CASE-{rng.randint(2015, 2025)}-{i:06d}")
+
+
+def generate_wanted(count, rng):
+    for i in range(count):
+        phones = ','.join(random_phone(rng) for _ in range(rng.randint(1, 2)))
+        yield (random_name(rng), rng.choice(LAST_NAMES) + ' ' + rng.choice(LETTERS),
+               f"{rng.randint(1960, 2004)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+               rng.choice(['Male', 'Female']), rng.choice(STATE_CODES), rng.choice(CRIMES),
+               rng.choice(['HIGH', 'MEDIUM', 'LOW']), f"{rng.choice(STATE_CODES)} area",
+               rng.randrange(1, 100) * 1_000_000,
+               f"{22_000_000_000 + i}", f"{33_000_000_000 + i}", phones)
+
+
+def generate_logs(count, vehicle_count, rng):
+    """Log rows in time order, evenly spread over the last LOG_MONTHS months"""
+    end = time.time()
+    start = end - LOG_MONTHS * 30 * 86400
+    step = (end - start) / max(count, 1)
+    outcomes = [('CLEAR', 'ALLOW_PASSAGE'), ('HIGH', 'DETAILED_INSPECTION'),
+                ('MEDIUM', 'VERIFY_DOCUMENTS'), ('CRITICAL', 'DETAIN_IMMEDIATELY')]
+    for i in range(count):
+        if rng.random() < 0.95:
+            index = rng.randrange(vehicle_count)
+        else:  # Unregistered vehicle
+            index = vehicle_count + rng.randrange(max(vehicle_count // 20, 1))
+        result, action = rng.choices(outcomes, weights=[90, 5, 3, 2])[0]
+        yield checkpoint_system.make_log_row(
+            f"Checkpoint {rng.randrange(CHECKPOINTS):03d}", plate_for(index), random_name(rng),
+            rng.randint(1, 18), result, action, f"Officer {rng.randrange(5000):04d}",
+            logged_at=start + i * step)
+
+
+def generate_database(db_path, scale=1.0, seed=7):
+    """Build a synthetic national-scale checkpoint database at db_path"""
+    counts = {name: max(1, int(count * scale)) for name, count in NATIONAL_SCALE.items()}
+    rng = random.Random(seed)
+    start = time.perf_counter()
+
+    conn = checkpoint_system.get_connection(db_path)
+    checkpoint_system.migrate_database(conn)
+    bulk_import.bulk_load('vehicles', generate_vehicles(counts['vehicles'], rng), db_path)
+    bulk_import.bulk_load('stolen_vehicles',
+                          generate_stolen(counts['stolen_vehicles'], counts['vehicles'], rng),
+                          db_path)
+    bulk_import.bulk_load('wanted_persons', generate_wanted(counts['wanted_persons'], rng), db_path)
+
+    cursor = conn.cursor()
+    logs = generate_logs(counts['logs'], counts['vehicles'], rng)
+    written = 0
+    while True:
+        batch = [row for _, row in zip(range(LOG_BATCH_ROWS), logs)]
+        if not batch:
+            break
+        with conn:
+            checkpoint_system.insert_log_rows(cursor, batch)
+        written += len(batch)
+        print(f"\r  logs: {written:,} rows", end="", file=sys.stderr)
+    print(file=sys.stderr)
+
+    print("  Rebuilding log analytics...")
+    with conn:
+        checkpoint_system.rebuild_log_analytics(cursor)
+        # A freshly generated database has no replicas to send these to
+        cursor.execute('DELETE FROM row_changes')
+    cursor.execute('ANALYZE')
+    print(f"✓ Generated {db_path}: " + ", ".join(f"{count:,} {name}" for name, count in counts.items())
+          + f" in {time.perf_counter() - start:.0f}s "
+          f"({os.path.getsize(db_path) / 1e9:.1f} GB)")
+
+
+# 🔵 Workload replay
+def load_workload(db_path, seed):
+    """Key pools (hits and misses) drawn from the database being benchmarked"""
+    rng = random.Random(seed)
+    cursor = checkpoint_system.get_connection(db_path).cursor()
+
+    def sample(table, columns):
+        max_rowid = cursor.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM {table}').fetchone()[0]
+        rowids = [rng.randint(1, max(max_rowid, 1)) for _ in range(SAMPLE_SIZE)]
+        return checkpoint_system._fetch_in(
+            cursor, f'SELECT {columns} FROM {table} WHERE rowid IN ({{placeholders}})', rowids)
+
+    registered = [row[0] for row in sample('vehicles', 'plate_number')]
+    stolen = [row[0] for row in sample('stolen_vehicles', 'plate_number')]
+    wanted = sample('wanted_persons', 'full_name, bvn, nin')
+    return {
+        'registered': registered or ['ABC-123-XY'],
+        'stolen': stolen or ['KAD-999-XX'],
+        'unknown': [f"{''.join(rng.choices(LETTERS, k=3))}-{rng.randint(100, 999)}-X{i % 10}"
+                    for i in range(1000)],
+        'wanted_names': [row[0] for row in wanted] or ['Musa Abubakar'],
+        'wanted_ids': [row[1] for row in wanted] + [row[2] for row in wanted] or ['11122233344'],
+    }
+
+
+def _run_operation(op, rng, workload, checkpoint_name):
+    if op == 'plate_check':
+        roll = rng.random()
+        pool = 'registered' if roll < 0.90 else 'unknown' if roll < 0.98 else 'stolen'
+        checkpoint_system.verify_vehicle(rng.choice(workload[pool]))
+    elif op == 'log_write':
+        checkpoint_system.log_checkpoint_activity(
+            checkpoint_name, rng.choice(workload['registered']), random_name(rng),
+            rng.randint(1, 18), 'CLEAR', 'ALLOW_PASSAGE', 'Benchmark Officer')
+    elif op == 'name_search':
+        # Half exact wanted names, half a common surname (many matches)
+        name = (rng.choice(workload['wanted_names']) if rng.random() < 0.5
+                else rng.choice(LAST_NAMES))
+        checkpoint_system.search_wanted_person(name=name)
+    else:
+        # Mostly innocent travellers: random identifiers miss the watch list
+        if rng.random() < 0.1:
+            identifier = rng.choice(workload['wanted_ids'])
+        else:
+            identifier = f"{rng.randrange(10 ** 11):011d}"
+        if rng.random() < 0.5:
+            checkpoint_system.search_wanted_person(bvn=identifier)
+        else:
+            checkpoint_system.search_wanted_person(nin=identifier)
+
+
+def run_level(concurrency, seconds, workload, seed):
+    """
+    Replay MIX from concurrency threads for seconds
+    Returns ({op: LatencyHistogram}, elapsed seconds)
+    """
+    names = [name for name, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    results = [{name: checkpoint_metrics.LatencyHistogram() for name in names}
+               for _ in range(concurrency)]
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(index):
+        rng = random.Random(seed * 10_000 + index)
+        histograms = results[index]
+        checkpoint_name = f"Benchmark Checkpoint {index}"
+        barrier.wait()
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            op = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            _run_operation(op, rng, workload, checkpoint_name)
+            histograms[op].record((time.perf_counter() - start) * 1_000_000)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    checkpoint_system.flush_checkpoint_logs()
+
+    merged = {name: checkpoint_metrics.LatencyHistogram() for name in names}
+    for histograms in results:
+        for name, histogram in histograms.items():
+            merged[name].merge(histogram)
+    return merged, elapsed
+
+
+def summarise(histograms, elapsed):
+    """JSON-ready numbers for one concurrency level"""
+    total = sum(h.total for h in histograms.values())
+    return {
+        'ops_per_second': total / elapsed,
+        'operations': {
+            name: {'count': h.total, 'p50_ms': h.percentile(0.50) / 1000,
+                   'p95_ms': h.percentile(0.95) / 1000, 'p99_ms': h.percentile(0.99) / 1000,
+                   'max_ms': h.max / 1000}
+            for name, h in histograms.items()
+        },
+    }
+
+
+def print_level(concurrency, summary, baseline=None):
+    print(f"\nConcurrency {concurrency}: {summary['ops_per_second']:,.0f} ops/s" + (
+        f" (baseline {baseline['ops_per_second']:,.0f}, "
+        f"{_change(summary['ops_per_second'], baseline['ops_per_second'])})" if baseline else ""))
+    print(f"  {'Operation':12} | {'Count':>8} | {'p50':>8} | {'p95':>8} | {'p99':>8} | "
+          f"{'Max':>8}" + (" | p99 vs baseline" if baseline else ""))
+    for name, numbers in summary['operations'].items():
+        line = (f"  {name:12} | {numbers['count']:8,} | {numbers['p50_ms']:6.2f}ms | "
+                f"{numbers['p95_ms']:6.2f}ms | {numbers['p99_ms']:6.2f}ms | "
+                f"{numbers['max_ms']:6.1f}ms")
+        previous = baseline and baseline['operations'].get(name)
+        if previous:
+            line += f" | {_change(numbers['p99_ms'], previous['p99_ms'])}"
+        print(line)
+
+
+def _change(now, before):
+    return f"{(now - before) / before * 100:+.1f}%" if before else "n/a"
+
+
+def run_benchmark(db_path, levels, seconds, seed=7, baseline=None):
+    """Replay the workload at each concurrency level; returns {level: summary}"""
+    checkpoint_system.DATABASE_PATH = db_path  # Operations use the default database
+    workload = load_workload(db_path, seed)
+    checkpoint_system.get_hotlist()            # Load the hot list before timing
+    print(f"Workload: {len(workload['registered']):,} registered plates, "
+          f"{len(workload['wanted_names']):,} wanted names sampled")
+
+    results = {}
+    for concurrency in levels:
+        histograms, elapsed = run_level(concurrency, seconds, workload, seed)
+        results[str(concurrency)] = summarise(histograms, elapsed)
+        print_level(concurrency, results[str(concurrency)],
+                    baseline and baseline.get(str(concurrency)))
+    return results
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="National-scale checkpoint database benchmark")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help="build the synthetic database")
+    generate.add_argument('--db', default=DEFAULT_DB, help="database file to create")
+    generate.add_argument('--scale', type=float, default=1.0,
+                          help="fraction of national scale (e.g. 0.01 for a quick run)")
+    generate.add_argument('--seed', type=int, default=7)
+    generate.add_argument('--force', action='store_true', help="replace an existing file")
+
+    run = commands.add_parser('run', help="replay the workload against a database")
+    run.add_argument('--db', default=DEFAULT_DB, help="database file to benchmark")
+    run.add_argument('--concurrency', default='1,4,16,64',
+                     help="comma-separated thread counts, run in order")
+    run.add_argument('--seconds', type=float, default=10, help="duration of each level")
+    run.add_argument('--seed', type=int, default=7)
+    run.add_argument('--json', help="save the results here (use as a later --baseline)")
+    run.add_argument('--baseline', help="results file from an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    db_path = os.path.abspath(args.db)
+    if args.command == 'generate':
+        if os.path.exists(db_path):
+            if not args.force:
+                print(f"❌ {db_path} exists (use --force to replace it)")
+                return 1
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+        generate_database(db_path, args.scale, args.seed)
+        return 0
+
+    if not os.path.exists(db_path):
+        print(f"❌ {db_path} not found - run the generate command first")
+        return 1
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['levels']
+
+    print("=" * 70)
+    print("CHECKPOINT DATABASE BENCHMARK")
+    print(f"{db_path} | mix: " + ", ".join(f"{name} {weight:.0%}" for name, weight in MIX))
+    print("=" * 70)
+    levels = [int(level) for level in args.concurrency.split(',')]
+    results = run_benchmark(db_path, levels, args.seconds, args.seed, baseline)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'db': db_path, 'seconds': args.seconds, 'levels': results}, f, indent=2)
+        print(f"\n✓ Results saved to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Service Load Test - Checkpoint Verification Service
+Defense Application: Prove one server can answer every checkpoint post at once
+Simulates hundreds of concurrent checkpoint terminals and reports tail latency
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import checkpoint_metrics
+from checkpoint_service import CheckpointClient
+
+# Plates and identifiers from the sample data, plus made-up ones (the common case)
+KNOWN_PLATES = ['ABC-123-XY', 'KAD-456-ZZ', 'ZAM-890-EF', 'KAD-999-XX', 'ABJ-888-YY']
+KNOWN_NAMES = ['Musa', 'Garba', 'Okafor', 'Lawal', 'Adamu']
+KNOWN_NINS = ['11122233344', '22233344455', '98765432100']
+
+# Share of each operation in the traffic mix (each vehicle check is also logged)
+MIX = [('verify_vehicle', 0.75), ('search_person', 0.20), ('verify_vehicles', 0.05)]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def random_plate(rng):
+    if rng.random() < 0.2:
+        return rng.choice(KNOWN_PLATES)
+    letters = ''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))
+    return f"{letters}-{rng.randint(100, 999)}-{rng.choice(['XY', 'AB', 'KD'])}"
+
+
+async def checkpoint_terminal(index, host, port, requests, think_ms, latencies):
+    """One simulated checkpoint post: check vehicles/people one after another"""
+    rng = random.Random(index)
+    client = await CheckpointClient.connect(host, port)
+    checkpoint_name = f"Load Test Checkpoint {index}"
+    try:
+        for _ in range(requests):
+            op = rng.choices([name for name, _ in MIX], weights=[w for _, w in MIX])[0]
+            start = time.perf_counter()
+            if op == 'verify_vehicle':
+                result = await client.call(op, plate=random_plate(rng))
+                await client.call('log', checkpoint_name=checkpoint_name,
+                                  plate_number=result['plate_number'],
+                                  verification_result=result['alert_level'],
+                                  action_taken=result['action'], officer_name='Load Test',
+                                  details=result['details'])
+            elif op == 'verify_vehicles':
+                await client.call(op, plates=[random_plate(rng) for _ in range(rng.randint(2, 8))])
+            elif rng.random() < 0.5:
+                await client.call(op, name=rng.choice(KNOWN_NAMES))
+            else:
+                await client.call(op, nin=rng.choice(KNOWN_NINS))
+            latencies[op].append((time.perf_counter() - start) * 1000)
+
+            if think_ms:
+                await asyncio.sleep(rng.uniform(0, 2 * think_ms) / 1000)
+    finally:
+        await client.close()
+
+
+async def run_load(host, port, checkpoints, requests, think_ms):
+    """
+    Run every terminal concurrently
+    Returns (latencies by op, seconds, server-side metrics snapshot for the run)
+    """
+    latencies = {name: [] for name, _ in MIX}
+    admin = await CheckpointClient.connect(host, port)
+    try:
+        await admin.call('metrics', reset=True)  # Measure this run only
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            checkpoint_terminal(i, host, port, requests, think_ms, latencies)
+            for i in range(checkpoints)
+        ))
+        elapsed = time.perf_counter() - start
+        server_metrics = await admin.call('metrics')
+    finally:
+        await admin.close()
+    return latencies, elapsed, server_metrics
+
+
+def start_local_service(db_path, extra_args):
+    """Launch checkpoint_service.py on a scratch database; returns (process, port)"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, CHECKPOINT_DB=db_path)
+    process = subprocess.Popen(
+        [sys.executable, 'checkpoint_service.py', '--port', '0', *extra_args],
+        cwd=here, env=env, stdout=subprocess.PIPE, text=True
+    )
+    for line in process.stdout:
+        if 'listening on' in line:
+            return process, int(line.rsplit(':', 1)[1])
+    process.wait()
+    raise RuntimeError("Checkpoint service failed to start")
+
+
+def report(latencies, elapsed, server_metrics):
+    print("Client side (includes network and queueing):")
+    print(f"{'Operation':16} | {'Count':>7} | {'p50':>8} | {'p95':>8} | {'p99':>8} | {'Max':>8}")
+    print("-" * 70)
+    total = 0
+    for op, values in latencies.items():
+        values.sort()
+        total += len(values)
+        print(f"{op:16} | {len(values):7,} | {percentile(values, 0.50):6.1f}ms | "
+              f"{percentile(values, 0.95):6.1f}ms | {percentile(values, 0.99):6.1f}ms | "
+              f"{(values[-1] if values else 0):6.1f}ms")
+    print("-" * 70)
+    everything = sorted(v for values in latencies.values() for v in values)
+    print(f"All operations: {total:,} in {elapsed:.1f}s ({total / elapsed:,.0f} ops/s), "
+          f"p99 {percentile(everything, 0.99):.1f}ms")
+    print("\nServer side (checkpoint_metrics, time inside the database layer):")
+    print(checkpoint_metrics.format_report(checkpoint_metrics.merge_snapshots([server_metrics]), 3))
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Load test the checkpoint verification service")
+    parser.add_argument('--checkpoints', type=int, default=500, help="simulated checkpoint terminals")
+    parser.add_argument('--requests', type=int, default=20, help="operations per checkpoint")
+    parser.add_argument('--think-ms', type=float, default=0, help="mean pause between operations")
+    parser.add_argument('--connect', help="HOST:PORT of a running service (default: start one)")
+    parser.add_argument('--max-in-flight', type=int, help="passed to the local service")
+    parser.add_argument('--db-workers', type=int, help="passed to the local service")
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print("CHECKPOINT SERVICE LOAD TEST")
+    print(f"{args.checkpoints} checkpoints x {args.requests} operations")
+    print("=" * 70)
+
+    if args.connect:
+        host, port = args.connect.rsplit(':', 1)
+        report(*asyncio.run(
+            run_load(host, int(port), args.checkpoints, args.requests, args.think_ms)))
+        return 0
+
+    extra_args = []
+    if args.max_in_flight:
+        extra_args += ['--max-in-flight', str(args.max_in_flight)]
+    if args.db_workers:
+        extra_args += ['--db-workers', str(args.db_workers)]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        process, port = start_local_service(os.path.join(workdir, 'load_test.db'), extra_args)
+        try:
+            results = asyncio.run(
+                run_load('127.0.0.1', port, args.checkpoints, args.requests, args.think_ms))
+        finally:
+            process.terminate()
+            process.wait()
+        report(*results)
+
+    print("=" * 70)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
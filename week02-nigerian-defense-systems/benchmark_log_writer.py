@@ -0,0 +1,92 @@
+"""
+Log Writer Benchmark - Checkpoint System
+Defense Application: Keep audit logging off the officer's critical path
+Compares per-row commits with the write-behind / group-commit log writer
+while many checkpoints log vehicles at the same time
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import checkpoint_system
+
+MODES = ['direct', 'group', 'buffered']
+
+
+def run_mode(mode, checkpoints, entries_per_checkpoint, db_path):
+    """Log entries from concurrent checkpoint threads; return (seconds, worst call ms)"""
+    writer = checkpoint_system.CheckpointLogWriter(db_path, durability=mode)
+    if mode == 'direct':
+        # Per-row commits with full fsync - what every entry cost before the writer
+        setup_sql = 'PRAGMA synchronous = FULL'
+    else:
+        setup_sql = None
+
+    worst = [0.0] * checkpoints
+    barrier = threading.Barrier(checkpoints + 1)
+
+    def checkpoint(index):
+        if setup_sql:
+            checkpoint_system.get_connection(db_path).execute(setup_sql)
+        barrier.wait()
+        for i in range(entries_per_checkpoint):
+            start = time.perf_counter()
+            writer.submit(checkpoint_system.make_log_row(
+                f"Checkpoint {index}", f"BEN-{i:03d}-CH", "Driver", 2,
+                'CLEAR', 'ALLOW_PASSAGE', "Officer"))
+            worst[index] = max(worst[index], (time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=checkpoint, args=(i,)) for i in range(checkpoints)]
+    for thread in threads:
+        thread.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    writer.close()  # Count the final flush - every entry must be on disk
+    elapsed = time.perf_counter() - start
+
+    return elapsed, max(worst)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark checkpoint log writing")
+    parser.add_argument('--checkpoints', type=int, default=16, help="concurrent checkpoints")
+    parser.add_argument('--entries', type=int, default=200, help="log entries per checkpoint")
+    parser.add_argument('--modes', default=','.join(MODES), help="comma-separated modes")
+    args = parser.parse_args(argv)
+
+    total = args.checkpoints * args.entries
+    print("=" * 70)
+    print("CHECKPOINT LOG WRITER BENCHMARK")
+    print(f"{args.checkpoints} checkpoints x {args.entries} entries = {total:,} log rows")
+    print("=" * 70)
+    print(f"{'Mode':10} | {'Seconds':>8} | {'Rows/sec':>10} | {'Worst call':>10}")
+    print("-" * 70)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in args.modes.split(','):
+            db_path = os.path.join(workdir, f"bench_{mode}.db")
+            conn = checkpoint_system.get_connection(db_path)
+            checkpoint_system.migrate_database(conn)
+
+            elapsed, worst_ms = run_mode(mode, args.checkpoints, args.entries, db_path)
+
+            count = conn.execute('SELECT COUNT(*) FROM checkpoint_logs').fetchone()[0]
+            assert count == total, f"{mode}: expected {total} rows, found {count}"
+            print(f"{mode:10} | {elapsed:8.2f} | {total / elapsed:10,.0f} | {worst_ms:8.1f}ms")
+
+        checkpoint_system.close_connections()
+
+    print("=" * 70)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
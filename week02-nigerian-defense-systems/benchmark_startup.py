@@ -0,0 +1,80 @@
+"""
+Startup Benchmark - Crime Pattern Analyzer
+Defense Application: Keep field tools fast to launch on low-spec laptops
+Guards the cold-start budget of the analyzer CLI and catches heavy imports creeping back in
+"""
+
+import os
+import subprocess
+import sys
+import statistics
+
+MODULE = "crime_pattern_analyzer"
+STARTUP_BUDGET_MS = 150  # Cold-start budget for importing the analyzer
+RUNS = 10
+
+# Modules that must NOT be loaded just by importing the analyzer
+HEAVY_MODULES = ["pandas", "matplotlib", "numpy"]
+
+
+def measure_import_ms(module=MODULE):
+    """
+    Import the module in a fresh interpreter and return wall-clock milliseconds
+    A new process every time means nothing is already cached in sys.modules
+    """
+    code = (
+        "import time, sys\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = (time.perf_counter() - start) * 1000\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(elapsed, ','.join(heavy))\n"
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=here, capture_output=True, text=True, check=True
+    ).stdout.split()
+
+    elapsed = float(output[0])
+    heavy = output[1].split(",") if len(output) > 1 else []
+    return elapsed, heavy
+
+
+def run_benchmark(runs=RUNS, budget_ms=STARTUP_BUDGET_MS):
+    """Run the import benchmark and return True if within budget"""
+    print("=" * 70)
+    print(f"STARTUP BENCHMARK - {MODULE}")
+    print("=" * 70)
+
+    timings = []
+    heavy_loaded = set()
+    for _ in range(runs):
+        elapsed, heavy = measure_import_ms()
+        timings.append(elapsed)
+        heavy_loaded.update(heavy)
+
+    median = statistics.median(timings)
+    print(f"Runs:    {runs}")
+    print(f"Median:  {median:.1f} ms")
+    print(f"Best:    {min(timings):.1f} ms")
+    print(f"Worst:   {max(timings):.1f} ms")
+    print(f"Budget:  {budget_ms} ms")
+    print()
+
+    passed = True
+    if heavy_loaded:
+        print(f"❌ Heavy modules loaded at import: {', '.join(sorted(heavy_loaded))}")
+        passed = False
+    if median > budget_ms:
+        print(f"❌ Median import time over budget ({median:.1f} ms > {budget_ms} ms)")
+        passed = False
+    if passed:
+        print("✅ Startup within budget")
+    print("=" * 70)
+
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_benchmark() else 1)
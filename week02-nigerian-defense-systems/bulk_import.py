@@ -0,0 +1,350 @@
+"""
+Bulk Import Pipeline - Checkpoint System
+Defense Application: Load national vehicle registry and watch-list exports
+Streams CSV/JSONL exports into checkpoint_database.db in large transactions,
+defers index maintenance until the end, and resumes after an interruption
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+
+import checkpoint_sync
+import checkpoint_system
+
+BATCH_ROWS = 50_000          # Rows per transaction (progress is saved with each one)
+IMPORT_CACHE_SIZE = -262144  # 256 MB page cache while loading and re-indexing
+
+# 🔵 Dataset definitions - export columns are matched by name
+DATASETS = {
+    'vehicles': {
+        'table': 'vehicles',
+        'columns': ['plate_number', 'owner_name', 'owner_phone', 'vehicle_make', 'vehicle_model',
+                    'vehicle_color', 'registration_date', 'state_registered', 'status'],
+        # Registry re-exports update the existing registration for a plate. An
+        # upsert (not INSERT OR REPLACE, which deletes without firing the delete
+        # triggers) keeps the suspended-plate hot list counts correct.
+        'upsert_key': 'plate_number',
+    },
+    'stolen_vehicles': {
+        'table': 'stolen_vehicles',
+        'columns': ['plate_number', 'vehicle_make', 'vehicle_model', 'vehicle_color',
+                    'stolen_date', 'stolen_location', 'owner_name', 'owner_phone', 'case_number'],
+    },
+    'wanted_persons': {
+        'table': 'wanted_persons',
+        'columns': ['full_name', 'aliases', 'date_of_birth', 'gender', 'state_of_origin', 'crime',
+                    'wanted_level', 'last_seen_location', 'reward_amount', 'bvn', 'nin',
+                    'phone_numbers'],
+        # Maintained per row by triggers; rebuilt in one pass after the load instead
+        'full_text_index': 'wanted_persons_fts',
+    },
+}
+
+
+# 🔵 Streaming readers (one row tuple at a time - the export never sits in memory)
+def iter_export_rows(source, columns, offset=0):
+    """
+    Yield (byte offset after the record, row tuple in columns order) for each
+    record of a .csv or .jsonl export, starting at byte offset (0 = the top)
+    Missing fields and empty CSV cells become NULL
+    """
+    extension = os.path.splitext(source)[1].lower()
+    if extension not in ('.csv', '.jsonl'):
+        raise ValueError(f"Unsupported export format: {source} (use .csv or .jsonl)")
+
+    with open(source, 'rb') as f:
+        position = offset
+
+        def lines():
+            # csv.reader pulls one line at a time, so after each record
+            # `position` is exactly where the next record starts
+            nonlocal position
+            while True:
+                line = f.readline()
+                if not line:
+                    return
+                position += len(line)
+                yield line.decode('utf-8')
+
+        if extension == '.csv':
+            reader = csv.reader(lines())
+            if offset:
+                header = next(csv.reader([f.readline().decode('utf-8')]), [])
+                f.seek(offset)
+            else:
+                header = next(reader, [])
+            positions = [header.index(column) if column in header else None for column in columns]
+            for record in reader:
+                yield position, tuple(record[i] or None if i is not None and i < len(record)
+                                      else None for i in positions)
+        else:
+            f.seek(offset)
+            for line in lines():
+                if line.strip():
+                    record = json.loads(line)
+                    yield position, tuple(record.get(column) for column in columns)
+
+
+def _insert_sql(dataset):
+    """INSERT statement for the dataset's columns (an upsert when it has upsert_key)"""
+    columns = dataset['columns']
+    sql = (f"INSERT INTO {dataset['table']} ({', '.join(columns)}) "
+           f"VALUES ({', '.join(['?'] * len(columns))})")
+    key = dataset.get('upsert_key')
+    if key:
+        assignments = ', '.join(f'{c} = excluded.{c}' for c in columns if c != key)
+        sql += f" ON CONFLICT ({key}) DO UPDATE SET {assignments}"
+    return sql
+
+
+# 🔵 Deferred index maintenance (NEW CONCEPT: drop, bulk load, rebuild)
+def _deferred_objects(cursor, dataset):
+    """
+    Secondary indexes, full-text triggers and replica sync triggers on the
+    dataset's table
+    Watch-list triggers stay in place so running checkpoints still see new
+    stolen plates and wanted identifiers through the hot list changelog. The
+    sync triggers would log every imported row; replicas are told to take a
+    full snapshot instead (see _rebuild).
+    """
+    cursor.execute('''
+        SELECT type, name, sql FROM sqlite_master
+        WHERE tbl_name = ? AND type = 'index' AND sql IS NOT NULL
+    ''', (dataset['table'],))
+    objects = cursor.fetchall()
+
+    prefixes = [f"{dataset['table']}_sync_"]
+    fts_table = dataset.get('full_text_index')
+    if fts_table:
+        prefixes.append(f'{fts_table}_')
+    for prefix in prefixes:
+        cursor.execute('''
+            SELECT type, name, sql FROM sqlite_master
+            WHERE tbl_name = ? AND type = 'trigger' AND name LIKE ?
+        ''', (dataset['table'], f'{prefix}%'))
+        objects += cursor.fetchall()
+    return [list(obj) for obj in objects]
+
+
+def _drop_objects(cursor, objects):
+    for obj_type, name, _ in objects:
+        cursor.execute(f'DROP {obj_type.upper()} IF EXISTS "{name}"')
+
+
+def _rebuild(conn, dataset, objects):
+    """Recreate deferred indexes/triggers and rebuild the full-text index"""
+    cursor = conn.cursor()
+    cursor.execute('BEGIN')
+    try:
+        _drop_objects(cursor, objects)  # In case a migration recreated any meanwhile
+        for obj_type, name, sql in objects:
+            print(f"  Rebuilding {obj_type} {name}...")
+            cursor.execute(sql)
+
+        fts_table = dataset.get('full_text_index')
+        if fts_table and any(name.startswith(f'{fts_table}_') for _, name, _ in objects):
+            print(f"  Rebuilding full-text index {fts_table}...")
+            cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+        if any(name.startswith(f"{dataset['table']}_sync_") for _, name, _ in objects):
+            checkpoint_sync.mark_full_sync(cursor)  # Replicas missed the per-row changelog
+        cursor.execute('COMMIT')
+    except Exception:
+        cursor.execute('ROLLBACK')
+        raise
+
+    cursor.execute(f"ANALYZE {dataset['table']}")
+
+
+# 🔵 Import progress (NEW CONCEPT: resumable checkpoints)
+def _load_progress(cursor, dataset_name, source):
+    cursor.execute('''
+        SELECT source_size, rows_done, status, deferred_sql, byte_offset FROM import_progress
+        WHERE dataset = ? AND source = ?
+    ''', (dataset_name, source))
+    return cursor.fetchone()
+
+
+def _save_progress(cursor, dataset_name, source, source_size, rows_done, byte_offset, status,
+                   objects):
+    cursor.execute('''
+        INSERT OR REPLACE INTO import_progress
+        (dataset, source, source_size, rows_done, byte_offset, status, deferred_sql, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (dataset_name, source, source_size, rows_done, byte_offset, status, json.dumps(objects),
+          datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+
+def import_export(dataset_name, source, db_path=None, batch_rows=BATCH_ROWS, restart=False):
+    """
+    Import one export file into its table; returns the number of rows imported now
+    Each batch and its progress record commit together, so re-running after a
+    crash or Ctrl-C continues after the last committed row. Only one import per
+    table should run at a time.
+    """
+    dataset = DATASETS.get(dataset_name)
+    if dataset is None:
+        raise ValueError(f"Unknown dataset: {dataset_name} (choose from {', '.join(DATASETS)})")
+
+    source = os.path.abspath(source)
+    source_size = os.path.getsize(source)
+
+    conn = checkpoint_system.get_connection(db_path)
+    checkpoint_system.migrate_database(conn)
+    conn.execute(f'PRAGMA cache_size = {IMPORT_CACHE_SIZE}')
+    cursor = conn.cursor()
+
+    progress = _load_progress(cursor, dataset_name, source)
+    if progress and not restart:
+        saved_size, rows_done, status, deferred_sql, byte_offset = progress
+        if saved_size != source_size:
+            raise ValueError(f"{source} changed since the last import "
+                             f"({saved_size:,} -> {source_size:,} bytes); use --restart")
+        if status == 'done':
+            print(f"✓ {source} already imported ({rows_done:,} rows)")
+            return 0
+        objects = json.loads(deferred_sql)
+        print(f"↻ Resuming {dataset_name} import after row {rows_done:,}")
+    else:
+        rows_done = byte_offset = 0
+        objects = _deferred_objects(cursor, dataset)
+        if progress and progress[2] == 'loading':
+            # Restarting an interrupted import: its indexes are still dropped
+            known = {obj[1] for obj in objects}
+            objects += [obj for obj in json.loads(progress[3]) if obj[1] not in known]
+
+    # Record what is being dropped in the same transaction that drops it
+    cursor.execute('BEGIN')
+    _drop_objects(cursor, objects)
+    _save_progress(cursor, dataset_name, source, source_size, rows_done, byte_offset, 'loading',
+                   objects)
+    cursor.execute('COMMIT')
+
+    insert_sql = _insert_sql(dataset)
+    if byte_offset is None:
+        # Progress saved before byte offsets were recorded: skip rows the slow way
+        rows = islice(iter_export_rows(source, dataset['columns']), rows_done, None)
+    else:
+        rows = iter_export_rows(source, dataset['columns'], byte_offset)
+    imported = 0
+    start = time.perf_counter()
+    while True:
+        batch = list(islice(rows, batch_rows))
+        if not batch:
+            break
+        byte_offset = batch[-1][0]
+        cursor.execute('BEGIN')
+        try:
+            cursor.executemany(insert_sql, [row for _, row in batch])
+            rows_done += len(batch)
+            _save_progress(cursor, dataset_name, source, source_size, rows_done, byte_offset,
+                           'loading', objects)
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        imported += len(batch)
+        elapsed = time.perf_counter() - start
+        print(f"\r  {dataset_name}: {rows_done:,} rows ({imported / elapsed:,.0f} rows/s)",
+              end="", file=sys.stderr)
+    print(file=sys.stderr)
+
+    _rebuild(conn, dataset, objects)
+    cursor.execute('BEGIN')
+    _save_progress(cursor, dataset_name, source, source_size, rows_done, byte_offset, 'done', [])
+    cursor.execute('COMMIT')
+    conn.execute(f"PRAGMA cache_size = {checkpoint_system.SQLITE_PRAGMAS['cache_size']}")
+
+    print(f"✓ Imported {imported:,} {dataset_name} rows from {source} "
+          f"in {time.perf_counter() - start:.1f}s")
+    return imported
+
+
+def bulk_load(dataset_name, rows, db_path=None, batch_rows=BATCH_ROWS):
+    """
+    Load an iterable of row tuples (dataset column order) with indexes deferred
+    For generated data: no progress is recorded, so an interrupted load must be
+    redone on a fresh database. Returns the number of rows loaded.
+    """
+    dataset = DATASETS[dataset_name]
+    conn = checkpoint_system.get_connection(db_path)
+    checkpoint_system.migrate_database(conn)
+    conn.execute(f'PRAGMA cache_size = {IMPORT_CACHE_SIZE}')
+    cursor = conn.cursor()
+
+    objects = _deferred_objects(cursor, dataset)
+    cursor.execute('BEGIN')
+    _drop_objects(cursor, objects)
+    cursor.execute('COMMIT')
+
+    insert_sql = _insert_sql(dataset)
+    rows = iter(rows)
+    loaded = 0
+    start = time.perf_counter()
+    while True:
+        batch = list(islice(rows, batch_rows))
+        if not batch:
+            break
+        with conn:
+            cursor.executemany(insert_sql, batch)
+        loaded += len(batch)
+        print(f"\r  {dataset_name}: {loaded:,} rows "
+              f"({loaded / (time.perf_counter() - start):,.0f} rows/s)", end="", file=sys.stderr)
+    print(file=sys.stderr)
+
+    _rebuild(conn, dataset, objects)
+    conn.execute(f"PRAGMA cache_size = {checkpoint_system.SQLITE_PRAGMAS['cache_size']}")
+    return loaded
+
+
+def show_progress(db_path=None):
+    """Print every recorded import and its state"""
+    conn = checkpoint_system.get_connection(db_path)
+    checkpoint_system.migrate_database(conn)
+    rows = conn.execute('''
+        SELECT dataset, source, rows_done, status, updated_at FROM import_progress
+        ORDER BY updated_at
+    ''').fetchall()
+    if not rows:
+        print("No imports recorded")
+    for dataset_name, source, rows_done, status, updated_at in rows:
+        print(f"{updated_at} | {dataset_name:15} | {status:7} | {rows_done:>12,} rows | {source}")
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Bulk import national database exports")
+    parser.add_argument('dataset', nargs='?', choices=sorted(DATASETS), help="target table")
+    parser.add_argument('sources', nargs='*', help="export files (.csv or .jsonl)")
+    parser.add_argument('--db', help="database file (default: CHECKPOINT_DB or checkpoint_database.db)")
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS, help="rows per transaction")
+    parser.add_argument('--restart', action='store_true',
+                        help="ignore saved progress and read the files from the top")
+    parser.add_argument('--status', action='store_true', help="show recorded imports and exit")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        show_progress(args.db)
+        return 0
+    if not args.dataset or not args.sources:
+        parser.error("dataset and at least one source file are required")
+
+    try:
+        for source in args.sources:
+            import_export(args.dataset, source, args.db, args.batch_rows, args.restart)
+    except KeyboardInterrupt:
+        print("\n⚠️ Import interrupted - run the same command again to resume")
+        return 1
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
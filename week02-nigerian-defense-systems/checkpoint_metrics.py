@@ -0,0 +1,446 @@
+"""
+Checkpoint Latency Metrics - Instrumentation and SLO Report
+Defense Application: Prove every vehicle check answers inside 200 ms
+Per-operation timers with HDR-style histograms, database round trips and
+SQLite work counters, per-statement breakdown, export files and a report
+"""
+
+import argparse
+import atexit
+import itertools
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Switch instrumentation off with CHECKPOINT_METRICS=0; set CHECKPOINT_METRICS_FILE
+# to write a snapshot when the process exits
+METRICS_ENABLED = os.environ.get('CHECKPOINT_METRICS', '1') != '0'
+METRICS_FILE = os.environ.get('CHECKPOINT_METRICS_FILE')
+
+# Service level objectives in milliseconds per item (per vehicle, per person...)
+SLO_MS = {
+    'verify_vehicle': 200,
+    'verify_vehicles': 200,
+}
+PROGRESS_STEP = 100       # SQLite VM instructions between progress callbacks
+MAX_STATEMENTS = 200      # Distinct statements tracked per operation
+STATEMENT_SAMPLE_EVERY = 10  # Per-statement breakdown for 1 call in N (it costs ~80us)
+SQL_DISPLAY_CHARS = 160   # Statement text shown in the report (head ... tail)
+
+
+# 🔵 Histogram (NEW CONCEPT: HDR-style log-linear buckets)
+class LatencyHistogram:
+    """
+    Latency counts in microseconds with bounded relative error
+    Values below 2 * SUB_BUCKETS are exact; above that every power of two is
+    split into SUB_BUCKETS equal buckets, so any percentile is within 1/128
+    (under 1%) of the true value while memory stays a few hundred counters.
+    Histograms from several processes merge by adding counts.
+    """
+
+    SUB_BUCKET_BITS = 7
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @classmethod
+    def _bucket(cls, value):
+        """(lowest, highest) value sharing value's bucket"""
+        shift = max(0, value.bit_length() - cls.SUB_BUCKET_BITS - 1)
+        lowest = (value >> shift) << shift
+        return lowest, lowest + (1 << shift) - 1
+
+    def record(self, micros, count=1):
+        micros = max(0, int(micros))
+        lowest = self._bucket(micros)[0]
+        self.counts[lowest] = self.counts.get(lowest, 0) + count
+        self.total += count
+        self.min = micros if self.min is None else min(self.min, micros)
+        self.max = max(self.max, micros)
+
+    def merge(self, other):
+        for lowest, count in other.counts.items():
+            self.counts[lowest] = self.counts.get(lowest, 0) + count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, fraction):
+        """Highest value equivalent to the given percentile (0.99 = p99)"""
+        if not self.total:
+            return 0
+        rank = max(1, round(fraction * self.total))
+        seen = 0
+        for lowest in sorted(self.counts):
+            seen += self.counts[lowest]
+            if seen >= rank:
+                return min(self._bucket(lowest)[1], self.max)
+        return self.max
+
+    def count_above(self, micros):
+        """Recorded values above micros (bucket-accurate)"""
+        return sum(count for lowest, count in self.counts.items() if lowest > micros)
+
+    def to_dict(self):
+        return {'counts': {str(k): v for k, v in sorted(self.counts.items())},
+                'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        for lowest, count in data['counts'].items():
+            histogram.counts[int(lowest)] = count
+            histogram.total += count
+        histogram.min = data['min']
+        histogram.max = data['max']
+        return histogram
+
+
+class OperationStats:
+    """Everything recorded for one named operation"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()       # Per call
+        self.item_latency = LatencyHistogram()  # Per item (call time / items)
+        self.errors = 0
+        self.round_trips = 0      # SQL statements executed
+        self.vm_steps = 0         # SQLite VM instructions (tracks rows scanned)
+        self.statements = {}      # normalised SQL -> [executions, seconds, vm_steps]
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        self.item_latency.merge(other.item_latency)
+        self.errors += other.errors
+        self.round_trips += other.round_trips
+        self.vm_steps += other.vm_steps
+        for sql, (executions, seconds, steps) in other.statements.items():
+            totals = self.statements.setdefault(sql, [0, 0.0, 0])
+            totals[0] += executions
+            totals[1] += seconds
+            totals[2] += steps
+
+    def to_dict(self):
+        return {
+            'latency': self.latency.to_dict(), 'item_latency': self.item_latency.to_dict(),
+            'errors': self.errors, 'round_trips': self.round_trips, 'vm_steps': self.vm_steps,
+            'statements': self.statements,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.latency = LatencyHistogram.from_dict(data['latency'])
+        stats.item_latency = LatencyHistogram.from_dict(data['item_latency'])
+        stats.errors = data['errors']
+        stats.round_trips = data['round_trips']
+        stats.vm_steps = data['vm_steps']
+        stats.statements = {sql: list(totals) for sql, totals in data['statements'].items()}
+        return stats
+
+
+# 🔵 Recording
+_stats = {}
+_stats_lock = threading.Lock()
+_started_at = time.time()
+_current = threading.local()  # Innermost operation running on this thread
+_calls = itertools.count()
+
+
+class _Measurement:
+    """Counters for one running call, merged into _stats when it finishes"""
+
+    __slots__ = ('detailed', 'round_trips', 'vm_steps', 'statements', 'sql', 'sql_start',
+                 'sql_steps')
+
+    def __init__(self, detailed):
+        self.detailed = detailed  # Break time down per statement (sampled)
+        self.round_trips = 0
+        self.vm_steps = 0
+        self.statements = {}
+        self.sql = None
+        self.sql_start = 0.0
+        self.sql_steps = 0
+
+    def close_statement(self, now):
+        """
+        Charge the time and work since the last statement started to it
+        (approximate: includes any Python work done before the next statement)
+        """
+        if self.sql is not None:
+            totals = self.statements.setdefault(self.sql, [0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += now - self.sql_start
+            totals[2] += self.vm_steps - self.sql_steps
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_VALUE_LISTS = re.compile(r"\(\?(?:\s*,\s*\?)+\)|(?:\(\?\)\s*,\s*)+\(\?\)")
+
+
+def normalise_sql(sql):
+    """Statement text without literal values, so executions group by query"""
+    return _VALUE_LISTS.sub('(?, ...)', _LITERALS.sub('?', ' '.join(sql.split())))
+
+
+def _on_statement(sql):
+    measurement = getattr(_current, 'measurement', None)
+    if measurement is None or sql.startswith('--'):
+        return  # Not inside an operation, or a statement run by a trigger
+    measurement.round_trips += 1
+    if not measurement.detailed:
+        return
+    now = time.perf_counter()
+    measurement.close_statement(now)
+    measurement.sql = normalise_sql(sql)
+    measurement.sql_start = now
+    measurement.sql_steps = measurement.vm_steps
+
+
+def _on_progress():
+    measurement = getattr(_current, 'measurement', None)
+    if measurement is not None:
+        measurement.vm_steps += PROGRESS_STEP
+    return 0  # Non-zero would abort the statement
+
+
+def _install_callbacks(conn, active):
+    """Set (or clear) the counting callbacks; False if conn has been closed"""
+    try:
+        if active:
+            conn.set_trace_callback(_on_statement)
+            conn.set_progress_handler(_on_progress, PROGRESS_STEP)
+        else:
+            conn.set_trace_callback(None)
+            conn.set_progress_handler(None, 0)
+    except sqlite3.ProgrammingError:
+        return False
+    return True
+
+
+def _set_thread_callbacks(active):
+    connections = getattr(_current, 'connections', [])
+    connections[:] = [conn for conn in connections if _install_callbacks(conn, active)]
+
+
+def instrument_connection(conn):
+    """
+    Count statements and VM work on conn for whichever operation uses it
+    conn must only be used by the calling thread. The callbacks are only
+    installed while a measure() block runs on that thread, so unmeasured
+    work (bulk loads, maintenance) runs at full speed.
+    """
+    if METRICS_ENABLED:
+        if not hasattr(_current, 'connections'):
+            _current.connections = []
+        _current.connections.append(conn)
+        if getattr(_current, 'measurement', None) is not None:
+            _install_callbacks(conn, True)
+
+
+@contextmanager
+def measure(operation, items=1):
+    """Time the with-block as one call of operation covering items items"""
+    if not METRICS_ENABLED:
+        yield
+        return
+
+    outer = getattr(_current, 'measurement', None)
+    detailed = next(_calls) % STATEMENT_SAMPLE_EVERY == 0
+    measurement = _current.measurement = _Measurement(detailed)
+    if outer is None:
+        _set_thread_callbacks(True)
+    failed = False
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        end = time.perf_counter()
+        measurement.close_statement(end)
+        _current.measurement = outer
+        if outer is None:
+            _set_thread_callbacks(False)
+        _record(operation, (end - start) * 1_000_000, max(items, 1), measurement, failed)
+
+
+def _record(operation, micros, items, measurement, failed):
+    with _stats_lock:
+        stats = _stats.get(operation)
+        if stats is None:
+            stats = _stats[operation] = OperationStats()
+        stats.latency.record(micros)
+        stats.item_latency.record(micros / items, items)
+        stats.errors += failed
+        stats.round_trips += measurement.round_trips
+        stats.vm_steps += measurement.vm_steps
+        for sql, (executions, seconds, steps) in measurement.statements.items():
+            totals = stats.statements.get(sql)
+            if totals is None:
+                if len(stats.statements) >= MAX_STATEMENTS:
+                    continue
+                totals = stats.statements[sql] = [0, 0.0, 0]
+            totals[0] += executions
+            totals[1] += seconds
+            totals[2] += steps
+
+
+def timed(operation, items=None):
+    """
+    Decorator form of measure()
+    items, if given, maps the first argument to an item count (e.g. len).
+    """
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            count = items(args[0]) if items and args else 1
+            with measure(operation, count):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# 🔵 Snapshots, export and report
+def snapshot(reset=False):
+    """JSON-ready copy of everything recorded so far"""
+    global _started_at
+    with _stats_lock:
+        data = {
+            'pid': os.getpid(), 'started_at': _started_at, 'taken_at': time.time(),
+            'operations': {name: stats.to_dict() for name, stats in _stats.items()},
+        }
+        if reset:
+            _stats.clear()
+            _started_at = time.time()
+    return data
+
+
+def export_metrics(path, reset=False):
+    """Write a snapshot to path (JSON); returns the snapshot"""
+    data = snapshot(reset)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    return data
+
+
+def merge_snapshots(snapshots):
+    """Combine snapshots (e.g. from several service processes) into {operation: stats}"""
+    merged = {}
+    for data in snapshots:
+        for name, stats in data['operations'].items():
+            merged.setdefault(name, OperationStats()).merge(OperationStats.from_dict(stats))
+    return merged
+
+
+def _shorten(sql):
+    """Keep both ends of long statements - variants often differ only at the end"""
+    if len(sql) <= SQL_DISPLAY_CHARS:
+        return sql
+    tail = SQL_DISPLAY_CHARS // 3
+    return f"{sql[:SQL_DISPLAY_CHARS - tail - 5]} ... {sql[-tail:]}"
+
+
+def format_report(operations, top_statements=5):
+    """Text report: latency percentiles, SLO compliance and the costliest statements"""
+    lines = [
+        f"{'Operation':24} | {'Calls':>8} | {'p50':>8} | {'p95':>8} | {'p99':>8} | "
+        f"{'Max':>8} | {'Trips':>5} | {'VM k':>6} | {'Errors':>6}",
+        "-" * 105,
+    ]
+    for name in sorted(operations):
+        stats = operations[name]
+        latency = stats.latency
+        calls = max(latency.total, 1)
+        lines.append(
+            f"{name:24} | {latency.total:8,} | {latency.percentile(0.50) / 1000:6.1f}ms | "
+            f"{latency.percentile(0.95) / 1000:6.1f}ms | {latency.percentile(0.99) / 1000:6.1f}ms | "
+            f"{latency.max / 1000:6.1f}ms | {stats.round_trips / calls:5.1f} | "
+            f"{stats.vm_steps / calls / 1000:6.1f} | {stats.errors:6,}"
+        )
+    lines.append("-" * 105)
+    lines.append("Trips = SQL statements per call, VM k = thousands of SQLite VM steps per call, "
+                 "Errors = calls that raised")
+
+    for name, slo_ms in SLO_MS.items():
+        stats = operations.get(name)
+        if stats is None or not stats.item_latency.total:
+            continue
+        per_item = stats.item_latency
+        misses = per_item.count_above(slo_ms * 1000)
+        compliance = 100 * (1 - misses / per_item.total)
+        verdict = "✓ MET" if per_item.percentile(0.99) <= slo_ms * 1000 else "❌ MISSED"
+        lines.append(f"SLO {name}: {slo_ms}ms per item - {compliance:.2f}% within, "
+                     f"p99 {per_item.percentile(0.99) / 1000:.1f}ms per item {verdict}")
+
+    if top_statements:
+        for name in sorted(operations):
+            statements = sorted(operations[name].statements.items(),
+                                key=lambda item: item[1][1], reverse=True)[:top_statements]
+            if not statements:
+                continue
+            lines.append(f"\nCostliest statements in {name} "
+                         f"(1 in {STATEMENT_SAMPLE_EVERY} calls sampled):")
+            for sql, (executions, seconds, steps) in statements:
+                lines.append(f"  {seconds * 1000:9.1f}ms total | {executions:7,}x | "
+                             f"{steps / max(executions, 1):8.0f} VM/exec | {_shorten(sql)}")
+    return "\n".join(lines)
+
+
+if METRICS_FILE:
+    atexit.register(export_metrics, METRICS_FILE)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Checkpoint latency and SLO report")
+    parser.add_argument('files', nargs='*', help="metrics export files to merge")
+    parser.add_argument('--connect', help="HOST:PORT of a running checkpoint service")
+    parser.add_argument('--reset', action='store_true',
+                        help="with --connect: start a new measurement window afterwards")
+    parser.add_argument('--export', help="also write the merged snapshot(s) to this file")
+    parser.add_argument('--statements', type=int, default=5,
+                        help="costliest statements to list per operation")
+    args = parser.parse_args(argv)
+
+    snapshots = []
+    for path in args.files:
+        with open(path) as f:
+            snapshots.append(json.load(f))
+    if args.connect:
+        import asyncio
+        from checkpoint_service import CheckpointClient
+
+        async def fetch(host, port):
+            client = await CheckpointClient.connect(host, int(port))
+            try:
+                return await client.call('metrics', reset=args.reset)
+            finally:
+                await client.close()
+
+        snapshots.append(asyncio.run(fetch(*args.connect.rsplit(':', 1))))
+    if not snapshots:
+        parser.error("give metrics files or --connect")
+
+    operations = merge_snapshots(snapshots)
+    if args.export:
+        with open(args.export, 'w') as f:
+            json.dump({'taken_at': time.time(),
+                       'operations': {name: stats.to_dict() for name, stats in operations.items()}}, f)
+    print(format_report(operations, args.statements))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
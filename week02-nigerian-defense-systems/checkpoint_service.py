@@ -0,0 +1,233 @@
+"""
+Checkpoint Verification Service - Day 3, Session 2 (extension)
+Defense Application: One verification server for every checkpoint terminal
+Serves checkpoint_system lookups to many concurrent posts over a local socket
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import checkpoint_metrics
+import checkpoint_system
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8750
+DB_WORKERS = min(32, (os.cpu_count() or 1) * 4)  # Threads running SQLite calls
+MAX_IN_FLIGHT = 256           # Requests being worked on at once (across all terminals)
+MAX_REQUEST_BYTES = 1 << 20   # Longest accepted request line (large convoys)
+
+# Protocol: one JSON object per line in each direction.
+#   request:  {"id": 7, "op": "verify_vehicle", "plate": "ABC-123-XY"}
+#   response: {"id": 7, "ok": true, "result": {...}}
+#             {"id": 7, "ok": false, "error": "..."}
+# Responses carry the request id, so a terminal may pipeline requests and
+# receive answers out of order.
+
+
+# 🔵 Endpoints (blocking - always run on the database thread pool)
+def _op_verify_vehicle(request):
+    return checkpoint_system.verify_vehicle(request['plate'].strip().upper())
+
+
+def _op_verify_vehicles(request):
+    return checkpoint_system.verify_vehicles([p.strip().upper() for p in request['plates']])
+
+
+def _op_search_person(request):
+    return checkpoint_system.search_wanted_person(
+        name=request.get('name'), phone=request.get('phone'),
+        bvn=request.get('bvn'), nin=request.get('nin'),
+        fuzzy=request.get('fuzzy', False)
+    )
+
+
+def _op_log(request):
+    timestamp = checkpoint_system.log_checkpoint_activity(
+        request['checkpoint_name'], request['plate_number'],
+        request.get('driver_name', ''), request.get('passengers', ''),
+        request['verification_result'], request['action_taken'],
+        request['officer_name'], request.get('notes', ''), request.get('details')
+    )
+    return {'timestamp': timestamp}
+
+
+def _op_ping(request):
+    return {'status': 'ok'}
+
+
+def _op_metrics(request):
+    return checkpoint_metrics.snapshot(reset=request.get('reset', False))
+
+
+OPERATIONS = {
+    'verify_vehicle': _op_verify_vehicle,
+    'verify_vehicles': _op_verify_vehicles,
+    'search_person': _op_search_person,
+    'log': _op_log,
+    'ping': _op_ping,
+    'metrics': _op_metrics,
+}
+
+
+# 🔵 Async server (NEW CONCEPT: asyncio + thread pool for blocking I/O)
+class CheckpointService:
+    """
+    Accepts many checkpoint terminals at once on a single event loop
+    The loop only parses and routes requests; every SQLite call runs on a
+    fixed thread pool, where each worker keeps its own persistent connection
+    (checkpoint_system.get_connection), so all terminals share the same few
+    connections. A semaphore caps in-flight requests: once it is full the
+    server stops reading new requests, and TCP pushes back on the terminals.
+    """
+
+    def __init__(self, db_workers=DB_WORKERS, max_in_flight=MAX_IN_FLIGHT):
+        self.executor = ThreadPoolExecutor(max_workers=db_workers,
+                                           thread_name_prefix='checkpoint-db')
+        self.limit = asyncio.Semaphore(max_in_flight)
+        self.server = None
+        self.stats = {'connections': 0, 'requests': 0, 'errors': 0}
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start listening; returns the (host, port) actually bound"""
+        self.server = await asyncio.start_server(self._handle_terminal, host, port,
+                                                 limit=MAX_REQUEST_BYTES)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        """Stop accepting terminals and wait for running database work"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+
+    async def _handle_terminal(self, reader, writer):
+        self.stats['connections'] += 1
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # Oversized line or dropped terminal
+                if not line:
+                    break
+
+                await self.limit.acquire()  # Backpressure: stop reading when full
+                task = asyncio.create_task(self._handle_request(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self.stats['connections'] -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _handle_request(self, line, writer, write_lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            operation = OPERATIONS.get(request.get('op'))
+            if operation is None:
+                raise ValueError(f"Unknown operation: {request.get('op')!r}")
+
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, operation, request)
+            response = {'id': request_id, 'ok': True, 'result': result}
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.stats['errors'] += 1
+            response = {'id': request_id, 'ok': False, 'error': f"Bad request: {e}"}
+        except Exception as e:
+            self.stats['errors'] += 1
+            response = {'id': request_id, 'ok': False, 'error': str(e)}
+        finally:
+            self.limit.release()
+            self.stats['requests'] += 1
+
+        try:
+            async with write_lock:
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass  # Terminal went away before its answer was ready
+
+
+# 🔵 Terminal side
+class CheckpointClient:
+    """Minimal async client: one connection, one request at a time"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_REQUEST_BYTES)
+        return cls(reader, writer)
+
+    async def call(self, op, **params):
+        """Send one request and return its result (raises RuntimeError on failure)"""
+        self.next_id += 1
+        request = dict(params, id=self.next_id, op=op)
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Checkpoint service closed the connection")
+        response = json.loads(line)
+        if not response['ok']:
+            raise RuntimeError(response['error'])
+        return response['result']
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def run_service(host, port, db_workers, max_in_flight):
+    """Initialise the database and serve until interrupted"""
+    checkpoint_system.initialize_database()
+    service = CheckpointService(db_workers, max_in_flight)
+    bound_host, bound_port = await service.start(host, port)
+    print(f"✓ Checkpoint service listening on {bound_host}:{bound_port}", flush=True)
+    try:
+        await service.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Run the checkpoint verification service")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port (0 = any free port)")
+    parser.add_argument('--db-workers', type=int, default=DB_WORKERS,
+                        help="threads running database calls")
+    parser.add_argument('--max-in-flight', type=int, default=MAX_IN_FLIGHT,
+                        help="requests processed at once before new ones wait")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(run_service(args.host, args.port, args.db_workers, args.max_in_flight))
+    except KeyboardInterrupt:
+        print("\n✓ Checkpoint service stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
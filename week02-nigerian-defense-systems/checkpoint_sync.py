@@ -0,0 +1,376 @@
+"""
+Offline Checkpoint Node - Delta Sync
+Defense Application: Keep remote checkpoints working without connectivity
+A node keeps a local snapshot of the watch lists, pulls only rows changed at
+the central database when it can reach it, and queues its checkpoint logs
+for batch upload
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import uuid
+import zlib
+from datetime import datetime
+
+import checkpoint_system
+
+# Replicated tables and their key columns (row_changes.row_key holds the key)
+SYNC_TABLES = {
+    'vehicles': 'plate_number',
+    'stolen_vehicles': 'id',
+    'wanted_persons': 'id',
+}
+UPLOAD_BATCH_ROWS = 5_000  # Log entries per upload payload
+
+
+def _compress(payload):
+    return zlib.compress(json.dumps(payload, separators=(',', ':')).encode(), 6)
+
+
+def _decompress(data):
+    return json.loads(zlib.decompress(data))
+
+
+def _table_columns(cursor, table):
+    return [row[1] for row in cursor.execute(f'PRAGMA table_info({table})')]
+
+
+def _get_state(cursor, key, default=None):
+    cursor.execute('SELECT value FROM sync_state WHERE key = ?', (key,))
+    row = cursor.fetchone()
+    return default if row is None else row[0]
+
+
+def _set_state(cursor, key, value):
+    cursor.execute('INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)', (key, value))
+
+
+def _in_transaction(conn, work):
+    """Run work(cursor) in one explicit transaction and return its result"""
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        result = work(cursor)
+        cursor.execute('COMMIT')
+    except Exception:
+        cursor.execute('ROLLBACK')
+        raise
+    return result
+
+
+def mark_full_sync(cursor):
+    """
+    Make every replica take a full snapshot on its next sync (caller commits)
+    For bulk loads, which skip the per-row changelog: one marker row in
+    row_changes replaces millions of entries.
+    """
+    cursor.execute("INSERT INTO row_changes (table_name, row_key) VALUES ('*', 'full_sync')")
+    _set_state(cursor, 'full_sync_at', cursor.lastrowid)
+
+
+# 🔵 Central side (file-based stand-in for the national database)
+class CentralStandIn:
+    """
+    The central database as a directory holding central.db
+    If the directory (e.g. a mounted share or synced folder) is missing, the
+    node is offline. Deltas and log uploads travel as compressed JSON payloads.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.db_path = os.path.join(root, 'central.db')
+
+    def available(self):
+        return os.path.exists(self.db_path)
+
+    def connect(self):
+        conn = checkpoint_system.get_connection(self.db_path)
+        checkpoint_system.migrate_database(conn)
+        return conn
+
+    def export_delta(self, since_change_id):
+        """
+        Compressed payload of every replicated row changed after since_change_id
+        Falls back to a full snapshot for new nodes and for nodes older than
+        the last prune_changes().
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('BEGIN')  # One consistent read snapshot
+        try:
+            upto = cursor.execute('SELECT COALESCE(MAX(id), 0) FROM row_changes').fetchone()[0]
+            pruned_through = _get_state(cursor, 'changes_pruned_through', 0)
+            full_sync_at = _get_state(cursor, 'full_sync_at', 0)
+            full = (since_change_id == 0 or since_change_id < pruned_through
+                    or since_change_id < full_sync_at)
+
+            tables = {}
+            for table, key in SYNC_TABLES.items():
+                columns = _table_columns(cursor, table)
+                if full:
+                    rows = cursor.execute(f'SELECT * FROM {table}').fetchall()
+                    tables[table] = {'columns': columns, 'upserts': rows, 'deletes': []}
+                    continue
+
+                cursor.execute('''
+                    SELECT DISTINCT row_key FROM row_changes
+                    WHERE table_name = ? AND id > ? AND id <= ?
+                ''', (table, since_change_id, upto))
+                keys = [row[0] for row in cursor.fetchall()]
+                rows = checkpoint_system._fetch_in(
+                    cursor, f'SELECT * FROM {table} WHERE {key} IN ({{placeholders}})', keys)
+                present = {row[columns.index(key)] for row in rows}
+                tables[table] = {
+                    'columns': columns, 'upserts': rows,
+                    'deletes': [k for k in keys if k not in present],
+                }
+        finally:
+            cursor.execute('COMMIT')
+
+        return _compress({'from': since_change_id, 'to': upto, 'full': full, 'tables': tables})
+
+    def receive_logs(self, data):
+        """
+        Store an uploaded log batch; returns the number of new entries
+        Each (node, batch) is accepted once, so a retried upload is harmless. A
+        different batch under an already received (node, batch) - two nodes
+        sharing an id - raises ValueError, so the sender keeps its logs queued.
+        """
+        payload = _decompress(data)
+        rows = [tuple(row) for row in payload['rows']]
+        digest = hashlib.sha256(
+            json.dumps(payload['rows'], separators=(',', ':')).encode()).hexdigest()
+
+        def store(cursor):
+            cursor.execute('SELECT digest FROM sync_uploads WHERE node_id = ? AND batch_seq = ?',
+                           (payload['node_id'], payload['batch_seq']))
+            received = cursor.fetchone()
+            if received:
+                if received[0] is not None and received[0] != digest:
+                    raise ValueError(f"Batch {payload['batch_seq']} from node "
+                                     f"{payload['node_id']!r} does not match the batch already "
+                                     f"received - is another node using the same id?")
+                return 0
+            checkpoint_system.write_log_rows(cursor, rows)
+            cursor.execute('''
+                INSERT INTO sync_uploads (node_id, batch_seq, entries, received_at, digest)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (payload['node_id'], payload['batch_seq'], len(rows),
+                  datetime.now().strftime('%Y-%m-%d %H:%M:%S'), digest))
+            return len(rows)
+
+        return _in_transaction(self.connect(), store)
+
+    def prune_changes(self, keep_last=100_000):
+        """Drop old changelog rows; nodes further behind get a full snapshot"""
+        def prune(cursor):
+            upto = cursor.execute('SELECT COALESCE(MAX(id), 0) FROM row_changes').fetchone()[0]
+            cutoff = upto - keep_last
+            if cutoff > 0:
+                cursor.execute('DELETE FROM row_changes WHERE id <= ?', (cutoff,))
+                _set_state(cursor, 'changes_pruned_through', cutoff)
+            return max(cutoff, 0)
+
+        return _in_transaction(self.connect(), prune)
+
+
+# 🔵 Node side (NEW CONCEPT: offline-first replica)
+class CheckpointNode:
+    """
+    A checkpoint's local database used as a read replica plus a log outbox
+    Verification always runs against the local file, so it works offline;
+    sync() catches up whenever the central side is reachable.
+    """
+
+    def __init__(self, node_id=None, db_path=None):
+        self.db_path = db_path
+        self.conn = checkpoint_system.get_connection(db_path)
+        checkpoint_system.migrate_database(self.conn)
+        self.node_id = node_id or self._stored_node_id()
+
+    def _stored_node_id(self):
+        """This database's node id, generated once and kept in sync_state"""
+        def load(cursor):
+            node_id = _get_state(cursor, 'node_id')
+            if node_id is None:
+                node_id = f'node-{uuid.uuid4().hex}'
+                _set_state(cursor, 'node_id', node_id)
+            return node_id
+
+        return _in_transaction(self.conn, load)
+
+    def apply_delta(self, data):
+        """Apply a compressed delta in one transaction; returns (upserts, deletes)"""
+        payload = _decompress(data)
+
+        def apply(cursor):
+            upserts = deletes = 0
+            for table, change in payload['tables'].items():
+                key = SYNC_TABLES[table]
+                columns = change['columns']
+                if payload['full']:
+                    cursor.execute(f'DELETE FROM {table}')
+                # Upsert (not REPLACE) so UPDATE triggers keep the search indexes,
+                # identifier side tables and hot list changelog in step
+                assignments = ', '.join(f'{c} = excluded.{c}' for c in columns if c != key)
+                cursor.executemany(f'''
+                    INSERT INTO {table} ({', '.join(columns)})
+                    VALUES ({', '.join(['?'] * len(columns))})
+                    ON CONFLICT ({key}) DO UPDATE SET {assignments}
+                ''', change['upserts'])
+                cursor.executemany(f'DELETE FROM {table} WHERE {key} = ?',
+                                   [(k,) for k in change['deletes']])
+                upserts += len(change['upserts'])
+                deletes += len(change['deletes'])
+
+            _set_state(cursor, 'central_change_id', payload['to'])
+            # The replica never serves deltas itself - drop its own changelog
+            cursor.execute('DELETE FROM row_changes')
+            return upserts, deletes
+
+        return _in_transaction(self.conn, apply)
+
+    def pending_logs(self, limit=UPLOAD_BATCH_ROWS):
+        """Next batch of unsent log rows as [(partition, id, row)]"""
+        checkpoint_system.flush_checkpoint_logs()
+        cursor = self.conn.cursor()
+        pending = []
+        for table in checkpoint_system.list_log_partitions(cursor):
+            mark = _get_state(cursor, f'uploaded:{table}', 0)
+            cursor.execute(f'''
+                SELECT id, {', '.join(checkpoint_system.LOG_COLUMNS)} FROM {table}
+                WHERE id > ? ORDER BY id LIMIT ?
+            ''', (mark, limit - len(pending)))
+            pending.extend((table, row[0], row[1:]) for row in cursor.fetchall())
+            if len(pending) >= limit:
+                break
+        return pending
+
+    def _open_upload_batch(self):
+        """
+        The batch to upload next as (batch_seq, {partition: last id}), or (None, {})
+        Its range is saved before it is sent: after a crash between central
+        accepting it and advance(), the retry resends exactly those rows under
+        the same batch_seq (which central ignores), never a bigger batch.
+        """
+        cursor = self.conn.cursor()
+        saved = _get_state(cursor, 'upload_batch')
+        if saved:
+            batch = json.loads(saved)
+            return batch['batch_seq'], batch['upto']
+
+        pending = self.pending_logs()
+        if not pending:
+            return None, {}
+        upto = {}
+        for table, row_id, _ in pending:
+            upto[table] = row_id
+        batch_seq = _get_state(cursor, 'upload_seq', 0) + 1
+        _in_transaction(self.conn, lambda cursor: _set_state(
+            cursor, 'upload_batch', json.dumps({'batch_seq': batch_seq, 'upto': upto})))
+        return batch_seq, upto
+
+    def _upload_batch_rows(self, upto):
+        """Log rows after each partition's uploaded mark, up to the batch's last id"""
+        cursor = self.conn.cursor()
+        rows = []
+        for table, last_id in upto.items():
+            mark = _get_state(cursor, f'uploaded:{table}', 0)
+            cursor.execute(f'''
+                SELECT {', '.join(checkpoint_system.LOG_COLUMNS)} FROM {table}
+                WHERE id > ? AND id <= ? ORDER BY id
+            ''', (mark, last_id))
+            rows.extend(cursor.fetchall())
+        return rows
+
+    def push_logs(self, central):
+        """Upload queued logs in batches; returns the number of entries sent"""
+        sent = 0
+        while True:
+            batch_seq, upto = self._open_upload_batch()
+            if batch_seq is None:
+                return sent
+
+            rows = self._upload_batch_rows(upto)
+            central.receive_logs(_compress({
+                'node_id': self.node_id, 'batch_seq': batch_seq, 'rows': rows,
+            }))
+
+            # Central has it - advance the marks and close the batch
+            def advance(cursor):
+                for table, row_id in upto.items():
+                    _set_state(cursor, f'uploaded:{table}', row_id)
+                _set_state(cursor, 'upload_seq', batch_seq)
+                cursor.execute("DELETE FROM sync_state WHERE key = 'upload_batch'")
+
+            _in_transaction(self.conn, advance)
+            sent += len(rows)
+
+    def sync(self, central):
+        """
+        Pull watch-list changes and push queued logs if central is reachable
+        Returns a summary dict (status 'offline' when it is not)
+        """
+        if not central.available():
+            return {'status': 'offline', 'queued_logs': len(self.pending_logs())}
+
+        start = time.perf_counter()
+        since = _get_state(self.conn.cursor(), 'central_change_id', 0)
+        delta = central.export_delta(since)
+        upserts, deletes = self.apply_delta(delta)
+        sent = self.push_logs(central)
+        return {
+            'status': 'synced', 'delta_bytes': len(delta), 'upserts': upserts,
+            'deletes': deletes, 'logs_sent': sent, 'seconds': time.perf_counter() - start,
+        }
+
+
+def init_central(root):
+    """Create a central stand-in directory with the sample national data"""
+    os.makedirs(root, exist_ok=True)
+    central = CentralStandIn(root)
+    conn = central.connect()
+    cursor = conn.cursor()
+    if cursor.execute('SELECT COUNT(*) FROM vehicles').fetchone()[0] == 0:
+        checkpoint_system.populate_sample_data(conn, cursor)
+    return central
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Sync an offline checkpoint node with central")
+    parser.add_argument('--central', required=True, help="central stand-in directory")
+    parser.add_argument('--node-id', default=os.environ.get('CHECKPOINT_NODE_ID'),
+                        help="this checkpoint's node id, unique per node (default: an id "
+                             "generated on first run and kept in the local database)")
+    parser.add_argument('--init-central', action='store_true',
+                        help="create the central stand-in with sample data")
+    parser.add_argument('--watch', type=float, help="keep syncing every N seconds")
+    args = parser.parse_args(argv)
+
+    if args.init_central:
+        init_central(args.central)
+        print(f"✓ Central stand-in ready at {args.central}")
+
+    node = CheckpointNode(args.node_id)
+    central = CentralStandIn(args.central)
+    while True:
+        result = node.sync(central)
+        if result['status'] == 'offline':
+            print(f"⚠️ Central unreachable - working offline, "
+                  f"{result['queued_logs']:,} log entries queued")
+        else:
+            print(f"✓ Synced: {result['upserts']:,} rows updated, {result['deletes']:,} removed "
+                  f"({result['delta_bytes']:,} bytes), {result['logs_sent']:,} log entries "
+                  f"uploaded in {result['seconds']:.2f}s")
+        if not args.watch:
+            return 0
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
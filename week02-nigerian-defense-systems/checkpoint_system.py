@@ -6,20 +6,158 @@ Mission: Catch criminals, stolen vehicles, and threats at checkpoints
 
 import sqlite3
 import json
+import os
+import re
+import unicodedata
+import atexit
+import queue
+import threading
+import time
 from datetime import datetime
 import random
 import string
 
-# 🔵 TYPE THIS - Database initialization (NEW CONCEPT: SQL databases)
-def initialize_database():
+import checkpoint_metrics
+
+# Database file (override with the CHECKPOINT_DB environment variable)
+DATABASE_PATH = os.environ.get('CHECKPOINT_DB', 'checkpoint_database.db')
+
+# Connection tuning applied once per connection
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',        # Readers never block the writer
+    'synchronous': 'NORMAL',      # Safe with WAL, avoids an fsync per commit
+    'mmap_size': 268435456,       # 256 MB memory-mapped reads
+    'cache_size': -65536,         # 64 MB page cache (negative = KiB)
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,         # Wait up to 5s for a lock instead of failing
+}
+STATEMENT_CACHE_SIZE = 256  # Prepared statements kept per connection
+
+
+# 🔵 Identifier normalisation (NEW CONCEPT: canonical forms)
+# Officers type plates, phones and names in many shapes; everything is reduced
+# to one canonical key before it is stored in an index or looked up.
+# PLATE_KEY_SQL must stay identical to canonical_plate - it defines the
+# expression indexes on vehicles/stolen_vehicles.
+PLATE_KEY_SQL = "upper(replace(replace(replace({column}, ' ', ''), '-', ''), '.', ''))"
+
+
+def canonical_plate(plate):
+    """'abc 123-xy' -> 'ABC123XY'"""
+    return plate.upper().replace(' ', '').replace('-', '').replace('.', '')
+
+
+def canonical_phone(phone):
     """
-    Create and populate database with sample data
-    In production, this would connect to national databases
+    Nigerian phone number in E.164 form: '0801 112 2233', '+234 801-112-2233'
+    and '2348011122233' all become '+2348011122233'
+    Numbers that are not recognisably complete come back as bare digits.
     """
-    conn = sqlite3.connect('checkpoint_database.db')
-    cursor = conn.cursor()
+    digits = re.sub(r'\D', '', phone)
+    if phone.strip().startswith('+') or digits.startswith('234'):
+        number = digits
+    elif digits.startswith('00'):
+        number = digits[2:]                # International dialling prefix
+    elif digits.startswith('0') and len(digits) == 11:
+        number = '234' + digits[1:]        # Local format with trunk 0
+    elif len(digits) == 10 and digits[0] in '789':
+        number = '234' + digits            # Trunk 0 left off
+    else:
+        return digits                      # Fragment or unknown format
+
+    if number.startswith('2340'):
+        number = '234' + number[4:]        # '+234 (0) 801...'
+    if number.startswith('234') and len(number) != 13:
+        return digits
+    return '+' + number if 8 <= len(number) <= 15 else digits
+
+
+def is_complete_phone(canonical):
+    """True for a canonical_phone result that is a full number, not a fragment"""
+    return canonical.startswith('+')
+
+
+def fold_name(name):
+    """Case-, accent- and punctuation-insensitive form of a name"""
+    decomposed = unicodedata.normalize('NFKD', name)
+    letters = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', letters.lower()).split())
+
+
+def _phone_keys_json(phone_numbers):
+    """SQL helper: JSON array of complete canonical phones in a comma-joined list"""
+    keys = {canonical_phone(phone) for phone in (phone_numbers or '').split(',')}
+    return json.dumps(sorted(key for key in keys if is_complete_phone(key)))
+
+
+def _alias_keys_json(full_name, aliases):
+    """SQL helper: JSON array of folded full name and aliases"""
+    names = [full_name or ''] + (aliases or '').split(',')
+    return json.dumps(sorted({fold_name(name) for name in names} - {''}))
+
+
+# Registered on every connection; the wanted_phones/wanted_aliases triggers call them
+SQL_FUNCTIONS = {
+    'phone_keys_json': (1, _phone_keys_json),
+    'alias_keys_json': (2, _alias_keys_json),
+}
+
+
+# 🔵 Connection manager (NEW CONCEPT: persistent connections)
+_thread_local = threading.local()
+_open_connections = []
+_connections_lock = threading.Lock()
+
+
+def get_connection(db_path=None):
+    """
+    Return this thread's long-lived connection to the checkpoint database
+    Each thread gets its own connection (SQLite connections must not be shared
+    across threads), opened once, tuned with SQLITE_PRAGMAS and reused afterwards.
+    Identical SQL text reuses the connection's cached prepared statement.
+    Statements and VM work on it are counted by checkpoint_metrics while a
+    measured operation runs on this thread.
+    """
+    db_path = db_path or DATABASE_PATH
+    connections = getattr(_thread_local, 'connections', None)
+    if connections is None:
+        connections = _thread_local.connections = {}
     
-    # Create tables
+    conn = connections.get(db_path)
+    if conn is None:
+        # check_same_thread=False only so close_connections() can close it at shutdown;
+        # the connection itself is only ever used by the thread that opened it
+        conn = sqlite3.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE,
+                               check_same_thread=False)
+        for pragma, value in SQLITE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        for name, (arg_count, function) in SQL_FUNCTIONS.items():
+            conn.create_function(name, arg_count, function, deterministic=True)
+        checkpoint_metrics.instrument_connection(conn)
+        connections[db_path] = conn
+        with _connections_lock:
+            _open_connections.append((connections, db_path, conn))
+    
+    return conn
+
+
+def close_connections():
+    """Close every connection opened through get_connection (all threads)"""
+    with _connections_lock:
+        for connections, db_path, conn in _open_connections:
+            connections.pop(db_path, None)
+            conn.close()
+        _open_connections.clear()
+
+
+atexit.register(close_connections)
+
+
+# 🔵 Schema migrations (NEW CONCEPT: versioned schema upgrades)
+# The schema version lives in SQLite's PRAGMA user_version. Each migration runs
+# once, in its own transaction, so old database files are upgraded in place.
+def _migration_1_base_tables(cursor):
+    """Create the original checkpoint tables"""
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS vehicles (
             plate_number TEXT PRIMARY KEY,
@@ -81,15 +219,493 @@ def initialize_database():
             notes TEXT
         )
     ''')
+
+
+def _migration_2_lookup_indexes(cursor):
+    """Index every column used by checkpoint lookups (no more full table scans)"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_stolen_plate ON stolen_vehicles(plate_number)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_wanted_bvn ON wanted_persons(bvn)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_wanted_nin ON wanted_persons(nin)')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_logs_checkpoint_time
+        ON checkpoint_logs(checkpoint_name, timestamp)
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_logs_time ON checkpoint_logs(timestamp)')
+
+
+def _migration_3_wanted_search_index(cursor):
+    """
+    Trigram full-text index over names, aliases and phone numbers
+    Kept in sync with wanted_persons by triggers. Needs SQLite 3.34+ with FTS5;
+    on older builds searches keep using LIKE scans.
+    """
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS wanted_persons_fts USING fts5(
+                full_name, aliases, phone_numbers,
+                content='wanted_persons', content_rowid='id',
+                tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ Full-text search unavailable ({e}) - name searches will scan the table")
+        return
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS wanted_persons_fts_insert AFTER INSERT ON wanted_persons
+        BEGIN
+            INSERT INTO wanted_persons_fts(rowid, full_name, aliases, phone_numbers)
+            VALUES (new.id, new.full_name, new.aliases, new.phone_numbers);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS wanted_persons_fts_delete AFTER DELETE ON wanted_persons
+        BEGIN
+            INSERT INTO wanted_persons_fts(wanted_persons_fts, rowid, full_name, aliases, phone_numbers)
+            VALUES ('delete', old.id, old.full_name, old.aliases, old.phone_numbers);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS wanted_persons_fts_update
+        AFTER UPDATE OF full_name, aliases, phone_numbers ON wanted_persons
+        BEGIN
+            INSERT INTO wanted_persons_fts(wanted_persons_fts, rowid, full_name, aliases, phone_numbers)
+            VALUES ('delete', old.id, old.full_name, old.aliases, old.phone_numbers);
+            INSERT INTO wanted_persons_fts(rowid, full_name, aliases, phone_numbers)
+            VALUES (new.id, new.full_name, new.aliases, new.phone_numbers);
+        END
+    ''')
+
+    # Index the rows that already exist
+    cursor.execute("INSERT INTO wanted_persons_fts(wanted_persons_fts) VALUES ('rebuild')")
+
+
+def _migration_4_watchlist_changelog(cursor):
+    """
+    Changelog of watch-list membership, written by triggers
+    Each row says one value joined (+1) or left (-1) a list, so in-process
+    hot lists can catch up by reading only the rows they have not seen yet.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS watchlist_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            list_name TEXT NOT NULL,
+            value TEXT NOT NULL,
+            delta INTEGER NOT NULL
+        )
+    ''')
+
+    # Stolen plates
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS stolen_vehicles_watch_insert AFTER INSERT ON stolen_vehicles
+        WHEN new.plate_number IS NOT NULL
+        BEGIN
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            VALUES ('stolen_plate', new.plate_number, 1);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS stolen_vehicles_watch_delete AFTER DELETE ON stolen_vehicles
+        WHEN old.plate_number IS NOT NULL
+        BEGIN
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            VALUES ('stolen_plate', old.plate_number, -1);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS stolen_vehicles_watch_update
+        AFTER UPDATE OF plate_number ON stolen_vehicles
+        BEGIN
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            SELECT 'stolen_plate', old.plate_number, -1 WHERE old.plate_number IS NOT NULL;
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            SELECT 'stolen_plate', new.plate_number, 1 WHERE new.plate_number IS NOT NULL;
+        END
+    ''')
+
+    # Suspended registrations
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS vehicles_watch_insert AFTER INSERT ON vehicles
+        WHEN new.status = 'Suspended'
+        BEGIN
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            VALUES ('suspended_plate', new.plate_number, 1);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS vehicles_watch_delete AFTER DELETE ON vehicles
+        WHEN old.status = 'Suspended'
+        BEGIN
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            VALUES ('suspended_plate', old.plate_number, -1);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS vehicles_watch_update
+        AFTER UPDATE OF plate_number, status ON vehicles
+        BEGIN
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            SELECT 'suspended_plate', old.plate_number, -1 WHERE old.status = 'Suspended';
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            SELECT 'suspended_plate', new.plate_number, 1 WHERE new.status = 'Suspended';
+        END
+    ''')
+
+    # Wanted identifiers (phone_numbers is stored comma-joined; the hot list splits it)
+    for event, row, delta in (('INSERT', 'new', 1), ('DELETE', 'old', -1)):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS wanted_persons_watch_{event.lower()}
+            AFTER {event} ON wanted_persons
+            BEGIN
+                INSERT INTO watchlist_changes(list_name, value, delta)
+                SELECT 'wanted_bvn', {row}.bvn, {delta} WHERE {row}.bvn IS NOT NULL;
+                INSERT INTO watchlist_changes(list_name, value, delta)
+                SELECT 'wanted_nin', {row}.nin, {delta} WHERE {row}.nin IS NOT NULL;
+                INSERT INTO watchlist_changes(list_name, value, delta)
+                SELECT 'wanted_phone', {row}.phone_numbers, {delta}
+                WHERE {row}.phone_numbers IS NOT NULL;
+            END
+        ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS wanted_persons_watch_update
+        AFTER UPDATE OF bvn, nin, phone_numbers ON wanted_persons
+        BEGIN
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            SELECT 'wanted_bvn', old.bvn, -1 WHERE old.bvn IS NOT NULL;
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            SELECT 'wanted_nin', old.nin, -1 WHERE old.nin IS NOT NULL;
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            SELECT 'wanted_phone', old.phone_numbers, -1 WHERE old.phone_numbers IS NOT NULL;
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            SELECT 'wanted_bvn', new.bvn, 1 WHERE new.bvn IS NOT NULL;
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            SELECT 'wanted_nin', new.nin, 1 WHERE new.nin IS NOT NULL;
+            INSERT INTO watchlist_changes(list_name, value, delta)
+            SELECT 'wanted_phone', new.phone_numbers, 1 WHERE new.phone_numbers IS NOT NULL;
+        END
+    ''')
+
+
+def _migration_5_import_progress(cursor):
+    """
+    Progress of bulk imports (see bulk_import.py)
+    Updated in the same transaction as each imported batch, so an interrupted
+    import resumes exactly after the last committed row.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_progress (
+            dataset TEXT NOT NULL,
+            source TEXT NOT NULL,
+            source_size INTEGER,
+            rows_done INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL,
+            deferred_sql TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (dataset, source)
+        )
+    ''')
+
+
+def _migration_6_partitioned_logs(cursor):
+    """
+    Move checkpoint_logs into monthly partitions with epoch timestamps
+    The JSON notes blob is unpacked into structured columns, and
+    checkpoint_logs becomes a read-only view over all partitions.
+    """
+    # Free the name for the view before any partition is created
+    cursor.execute('ALTER TABLE checkpoint_logs RENAME TO checkpoint_logs_legacy')
+    old_rows = cursor.connection.cursor()
+    old_rows.execute('''
+        SELECT checkpoint_name, timestamp, plate_number, driver_name, passengers,
+               verification_result, action_taken, officer_name, notes
+        FROM checkpoint_logs_legacy ORDER BY id
+    ''')
+    rows = []
+    for (checkpoint_name, timestamp, plate_number, driver_name, passengers,
+         verification_result, action_taken, officer_name, notes) in old_rows:
+        try:
+            details = json.loads(notes) if notes else None
+        except ValueError:
+            details = None
+        logged_at = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S').timestamp()
+        rows.append(make_log_row(
+            checkpoint_name, plate_number, driver_name, passengers, verification_result,
+            action_taken, officer_name, '' if isinstance(details, dict) else notes,
+            details if isinstance(details, dict) else None, logged_at
+        ))
+        if len(rows) >= LOG_BATCH_SIZE:
+            insert_log_rows(cursor, rows)
+            rows = []
+    insert_log_rows(cursor, rows)
+
+    cursor.execute('DROP TABLE checkpoint_logs_legacy')
+    ensure_log_partition(cursor, log_partition_for(time.time()))
+    _rebuild_log_view(cursor)
+
+
+def _migration_7_normalised_identifiers(cursor):
+    """
+    Exact-match side tables for wanted phones/aliases and canonical plate indexes
+    wanted_phones and wanted_aliases are kept in sync by triggers that call the
+    SQL_FUNCTIONS helpers, so wanted_persons must be written through
+    get_connection() (plain sqlite3 shells do not have those functions).
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS wanted_phones (
+            phone_e164 TEXT NOT NULL,
+            person_id INTEGER NOT NULL,
+            PRIMARY KEY (phone_e164, person_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS wanted_aliases (
+            alias_norm TEXT NOT NULL,
+            person_id INTEGER NOT NULL,
+            PRIMARY KEY (alias_norm, person_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_wanted_phones_person ON wanted_phones(person_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_wanted_aliases_person ON wanted_aliases(person_id)')
+
+    add_keys = '''
+        INSERT OR IGNORE INTO wanted_phones(phone_e164, person_id)
+        SELECT value, new.id FROM json_each(phone_keys_json(new.phone_numbers));
+        INSERT OR IGNORE INTO wanted_aliases(alias_norm, person_id)
+        SELECT value, new.id FROM json_each(alias_keys_json(new.full_name, new.aliases));
+    '''
+    remove_keys = '''
+        DELETE FROM wanted_phones WHERE person_id = old.id;
+        DELETE FROM wanted_aliases WHERE person_id = old.id;
+    '''
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS wanted_persons_keys_insert AFTER INSERT ON wanted_persons
+        BEGIN {add_keys} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS wanted_persons_keys_delete AFTER DELETE ON wanted_persons
+        BEGIN {remove_keys} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS wanted_persons_keys_update
+        AFTER UPDATE OF full_name, aliases, phone_numbers ON wanted_persons
+        BEGIN {remove_keys} {add_keys} END
+    ''')
+
+    # Backfill existing people
+    cursor.execute('''
+        INSERT OR IGNORE INTO wanted_phones(phone_e164, person_id)
+        SELECT json_each.value, wanted_persons.id
+        FROM wanted_persons, json_each(phone_keys_json(wanted_persons.phone_numbers))
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO wanted_aliases(alias_norm, person_id)
+        SELECT json_each.value, wanted_persons.id
+        FROM wanted_persons, json_each(alias_keys_json(wanted_persons.full_name,
+                                                       wanted_persons.aliases))
+    ''')
+
+    # Plates: index the canonical form so 'ABC 123 XY' finds 'ABC-123-XY'
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_vehicles_plate_key
+        ON vehicles({PLATE_KEY_SQL.format(column='plate_number')})
+    ''')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_stolen_plate_key
+        ON stolen_vehicles({PLATE_KEY_SQL.format(column='plate_number')})
+    ''')
+    cursor.execute('DROP INDEX IF EXISTS idx_stolen_plate')  # Replaced by idx_stolen_plate_key
+
+
+def _migration_8_log_analytics(cursor):
+    """Summary tables for the supervisor dashboard, backfilled from existing logs"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS log_hourly_outcomes (
+            checkpoint_name TEXT NOT NULL,
+            hour_start INTEGER NOT NULL,
+            verification_result TEXT NOT NULL,
+            entries INTEGER NOT NULL,
+            PRIMARY KEY (checkpoint_name, hour_start, verification_result)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_hourly_outcomes_hour ON log_hourly_outcomes(hour_start)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS flagged_plate_counts (
+            plate_key TEXT PRIMARY KEY,
+            flag_count INTEGER NOT NULL,
+            last_flagged_at INTEGER NOT NULL,
+            last_result TEXT,
+            last_checkpoint TEXT
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_flagged_plate_counts_top
+        ON flagged_plate_counts(flag_count DESC, last_flagged_at DESC)
+    ''')
+    rebuild_log_analytics(cursor)
+
+
+def _migration_9_sync_changelog(cursor):
+    """
+    Row-level changelog and sync bookkeeping for offline replicas (checkpoint_sync.py)
+    row_changes records which vehicles/stolen_vehicles/wanted_persons rows
+    changed, so a replica only pulls rows changed since its last sync.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS row_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_key NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            key TEXT PRIMARY KEY,
+            value
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_uploads (
+            node_id TEXT NOT NULL,
+            batch_seq INTEGER NOT NULL,
+            entries INTEGER NOT NULL,
+            received_at TEXT,
+            PRIMARY KEY (node_id, batch_seq)
+        )
+    ''')
+
+    for table, key in (('vehicles', 'plate_number'), ('stolen_vehicles', 'id'),
+                       ('wanted_persons', 'id')):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_sync_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO row_changes(table_name, row_key) VALUES ('{table}', new.{key});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_sync_update AFTER UPDATE ON {table}
+            BEGIN
+                INSERT INTO row_changes(table_name, row_key)
+                SELECT '{table}', old.{key} WHERE old.{key} IS NOT new.{key};
+                INSERT INTO row_changes(table_name, row_key) VALUES ('{table}', new.{key});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_sync_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO row_changes(table_name, row_key) VALUES ('{table}', old.{key});
+            END
+        ''')
+
+
+def _migration_10_import_byte_offsets(cursor):
+    """
+    Byte position reached by each bulk import
+    A resumed import seeks straight to it instead of re-reading every row
+    already imported.
+    """
+    cursor.execute('ALTER TABLE import_progress ADD COLUMN byte_offset INTEGER')
+
+
+def _migration_11_upload_digests(cursor):
+    """
+    Content digest of each log batch central received
+    A batch resent under a known (node, batch_seq) must match it, so two nodes
+    sharing an id are refused instead of silently dropping each other's logs.
+    """
+    cursor.execute('ALTER TABLE sync_uploads ADD COLUMN digest TEXT')
+
+
+def _migration_12_log_extra_details(cursor):
+    """
+    extra column on every log partition for result details without a column
+    Partitions created since this change already have it.
+    """
+    for table in list_log_partitions(cursor):
+        columns = [row[1] for row in cursor.execute(f'PRAGMA table_info({table})').fetchall()]
+        if 'extra' not in columns:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN extra TEXT')
+    _rebuild_log_view(cursor)
+
+
+def _migration_13_log_view_partition_key(cursor):
+    """
+    log_partition column on the checkpoint_logs view
+    Partition ids restart at 1 every month, so (log_partition, id) is the row key.
+    """
+    _rebuild_log_view(cursor)
+
+
+# (version, description, function) - append new migrations, never edit old ones
+MIGRATIONS = [
+    (1, "Base tables", _migration_1_base_tables),
+    (2, "Lookup indexes", _migration_2_lookup_indexes),
+    (3, "Wanted person full-text index", _migration_3_wanted_search_index),
+    (4, "Watch-list changelog", _migration_4_watchlist_changelog),
+    (5, "Bulk import progress", _migration_5_import_progress),
+    (6, "Monthly checkpoint log partitions", _migration_6_partitioned_logs),
+    (7, "Normalised identifier lookups", _migration_7_normalised_identifiers),
+    (8, "Checkpoint log analytics", _migration_8_log_analytics),
+    (9, "Replica sync changelog", _migration_9_sync_changelog),
+    (10, "Bulk import byte offsets", _migration_10_import_byte_offsets),
+    (11, "Log upload digests", _migration_11_upload_digests),
+    (12, "Extra log details", _migration_12_log_extra_details),
+    (13, "Log view partition key", _migration_13_log_view_partition_key),
+]
+
+
+def get_schema_version(conn):
+    """Return the schema version stored in the database file"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate_database(conn):
+    """
+    Apply all pending migrations in order
+    Returns the list of versions that were applied
+    """
+    applied = []
+    current = get_schema_version(conn)
     
-    conn.commit()
+    for version, description, migration in MIGRATIONS:
+        if version <= current:
+            continue
+    
+        cursor = conn.cursor()
+        cursor.execute('BEGIN')
+        try:
+            migration(cursor)
+            cursor.execute(f'PRAGMA user_version = {version}')
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+    
+        applied.append(version)
+        print(f"✓ Schema migration {version} applied: {description}")
+    
+    if applied:
+        conn.execute('PRAGMA optimize')  # Refresh planner statistics for the new indexes
+    
+    return applied
+
+
+# 🔵 TYPE THIS - Database initialization (NEW CONCEPT: SQL databases)
+def initialize_database():
+    """
+    Create or upgrade the database schema and populate sample data
+    In production, this would connect to national databases
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    
+    migrate_database(conn)
     
     # Check if data already exists
     cursor.execute('SELECT COUNT(*) FROM vehicles')
     if cursor.fetchone()[0] == 0:
         populate_sample_data(conn, cursor)
     
-    conn.close()
+    get_hotlist()  # Load the watch-list hot list up front, not on the first car
     print("✓ Database initialized successfully")
 
 
@@ -153,134 +769,423 @@ def populate_sample_data(conn, cursor):
     print("✓ Sample data populated")
 
 
+# 🔵 Watch-list hot list (NEW CONCEPT: in-memory negative cache)
+HOTLIST_REFRESH_SECONDS = 1.0  # Max staleness before pulling new changelog rows
+HOTLIST_NAMES = ('stolen_plate', 'suspended_plate', 'wanted_bvn', 'wanted_nin', 'wanted_phone')
+
+
+def _hotlist_keys(list_name, value):
+    """Canonical hot list keys for one source value (phone_numbers is comma-joined)"""
+    if list_name == 'wanted_phone':
+        return [canonical_phone(phone) for phone in value.split(',') if phone.strip()]
+    if list_name in ('stolen_plate', 'suspended_plate'):
+        return [canonical_plate(value)]
+    return [value]
+
+
+class WatchlistHotList:
+    """
+    In-process copy of every flagged identifier
+    Almost every plate and ID seen at a checkpoint is clean; a miss here is a
+    definite "not on the watch list" with no database round trip. Hits still go
+    to the authoritative SQL query. Values are reference-counted so removing one
+    of two stolen reports for the same plate keeps the plate listed.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path
+        self.counts = {name: {} for name in HOTLIST_NAMES}
+        self.last_change_id = 0
+        self.last_refresh = 0.0
+        self.lock = threading.Lock()
+
+    def _apply(self, list_name, value, delta):
+        counts = self.counts[list_name]
+        for item in _hotlist_keys(list_name, value):
+            remaining = counts.get(item, 0) + delta
+            if remaining > 0:
+                counts[item] = remaining
+            else:
+                counts.pop(item, None)
+
+    def load(self):
+        """Full load from the source tables (startup)"""
+        conn = get_connection(self.db_path)
+        cursor = conn.cursor()
+        counts = {name: {} for name in HOTLIST_NAMES}
+
+        with self.lock:
+            # One read transaction so the snapshot and changelog position agree
+            cursor.execute('BEGIN')
+            try:
+                cursor.execute('SELECT COALESCE(MAX(id), 0) FROM watchlist_changes')
+                last_change_id = cursor.fetchone()[0]
+                sources = (
+                    ('stolen_plate', 'SELECT plate_number FROM stolen_vehicles WHERE plate_number IS NOT NULL'),
+                    ('suspended_plate', "SELECT plate_number FROM vehicles WHERE status = 'Suspended'"),
+                    ('wanted_bvn', 'SELECT bvn FROM wanted_persons WHERE bvn IS NOT NULL'),
+                    ('wanted_nin', 'SELECT nin FROM wanted_persons WHERE nin IS NOT NULL'),
+                    ('wanted_phone', 'SELECT phone_numbers FROM wanted_persons WHERE phone_numbers IS NOT NULL'),
+                )
+                for list_name, query in sources:
+                    for (value,) in cursor.execute(query):
+                        for item in _hotlist_keys(list_name, value):
+                            counts[list_name][item] = counts[list_name].get(item, 0) + 1
+            finally:
+                cursor.execute('COMMIT')
+
+            self.counts = counts
+            self.last_change_id = last_change_id
+            self.last_refresh = time.monotonic()
+
+    def refresh(self):
+        """Apply changelog rows written since the last load/refresh"""
+        with self.lock:
+            cursor = get_connection(self.db_path).cursor()
+            cursor.execute('''
+                SELECT id, list_name, value, delta FROM watchlist_changes
+                WHERE id > ? ORDER BY id
+            ''', (self.last_change_id,))
+            for change_id, list_name, value, delta in cursor.fetchall():
+                if list_name in self.counts:
+                    self._apply(list_name, value, delta)
+                self.last_change_id = change_id
+            self.last_refresh = time.monotonic()
+
+    def contains(self, list_name, value):
+        """
+        True if value is on the named list (refreshing first if stale)
+        Plates and phones must already be canonical (canonical_plate/canonical_phone)
+        """
+        if time.monotonic() - self.last_refresh > HOTLIST_REFRESH_SECONDS:
+            self.refresh()
+        return value in self.counts[list_name]
+
+    def is_flagged_plate(self, plate_number):
+        """True if the plate is reported stolen or has a suspended registration"""
+        key = canonical_plate(plate_number)
+        return self.contains('stolen_plate', key) or self.contains('suspended_plate', key)
+
+    def is_wanted_identifier(self, bvn=None, nin=None, phone=None):
+        """True if any given BVN, NIN or full phone number belongs to a wanted person"""
+        return ((bvn is not None and self.contains('wanted_bvn', bvn))
+                or (nin is not None and self.contains('wanted_nin', nin))
+                or (phone is not None and self.contains('wanted_phone', canonical_phone(phone))))
+
+
+_hotlists = {}
+_hotlists_lock = threading.Lock()
+
+
+def get_hotlist(db_path=None):
+    """Return the shared hot list for a database, loading it on first use"""
+    db_path = db_path or DATABASE_PATH
+    hotlist = _hotlists.get(db_path)
+    if hotlist is None:
+        with _hotlists_lock:
+            hotlist = _hotlists.get(db_path)
+            if hotlist is None:
+                hotlist = WatchlistHotList(db_path)
+                hotlist.load()
+                _hotlists[db_path] = hotlist
+    return hotlist
+
+
 # 🔵 TYPE THIS - Vehicle verification (CORE LOGIC)
+# One query answers both "is it registered?" and "is it stolen?" for a list of
+# canonical plates (matched through the PLATE_KEY_SQL expression indexes).
+# Plates not on the stolen hot list skip the stolen_vehicles probe.
+VEHICLE_CHECK_SQL = '''
+    WITH checked(plate) AS (VALUES {plates})
+    SELECT checked.plate AS plate_key,
+           v.plate_number IS NOT NULL AS is_registered,
+           v.owner_name, v.owner_phone, v.vehicle_make, v.vehicle_model,
+           v.vehicle_color, v.state_registered, v.status,
+           s.id AS stolen_id, s.vehicle_make AS stolen_make, s.vehicle_model AS stolen_model,
+           s.vehicle_color AS stolen_color, s.stolen_date, s.stolen_location,
+           s.owner_name AS stolen_owner, s.owner_phone AS stolen_owner_phone, s.case_number
+    FROM checked
+    LEFT JOIN vehicles v ON {vehicle_key} = checked.plate
+    LEFT JOIN stolen_vehicles s ON {stolen_join}
+    ORDER BY s.id
+'''
+VEHICLE_JOIN = PLATE_KEY_SQL.format(column='v.plate_number')
+STOLEN_JOIN = PLATE_KEY_SQL.format(column='s.plate_number') + ' = checked.plate'
+NO_STOLEN_JOIN = '0'  # Hot list says not stolen - no probe needed
+
+# (is_stolen, is_registered, is_suspended) -> (alert_level, action, status)
+VEHICLE_DECISIONS = {
+    (True, True, True): ('CRITICAL', 'DETAIN_IMMEDIATELY', '🚨 STOLEN VEHICLE'),
+    (True, True, False): ('CRITICAL', 'DETAIN_IMMEDIATELY', '🚨 STOLEN VEHICLE'),
+    (True, False, False): ('CRITICAL', 'DETAIN_IMMEDIATELY', '🚨 STOLEN VEHICLE'),
+    (False, False, False): ('HIGH', 'DETAILED_INSPECTION', '⚠️ UNREGISTERED VEHICLE'),
+    (False, True, True): ('MEDIUM', 'VERIFY_DOCUMENTS', '⚠️ SUSPENDED REGISTRATION'),
+    (False, True, False): ('CLEAR', 'ALLOW_PASSAGE', '✓ VERIFIED'),
+}
+
+
+def _vehicle_check_rows(cursor, plates, check_stolen):
+    """Run VEHICLE_CHECK_SQL for canonical plates; returns sqlite3.Row objects"""
+    cursor.row_factory = sqlite3.Row
+    cursor.execute(VEHICLE_CHECK_SQL.format(
+        plates=','.join(['(?)'] * len(plates)),
+        vehicle_key=VEHICLE_JOIN,
+        stolen_join=STOLEN_JOIN if check_stolen else NO_STOLEN_JOIN
+    ), plates)
+    return cursor.fetchall()
+
+
+@checkpoint_metrics.timed('verify_vehicle')
 def verify_vehicle(plate_number):
     """
     Verify vehicle registration and check if stolen
     Returns verification result with recommendations
     """
-    conn = sqlite3.connect('checkpoint_database.db')
-    cursor = conn.cursor()
-    
-    # Check if vehicle is registered
-    cursor.execute('SELECT * FROM vehicles WHERE plate_number = ?', (plate_number,))
-    vehicle = cursor.fetchone()
-    
-    # Check if vehicle is stolen
-    cursor.execute('SELECT * FROM stolen_vehicles WHERE plate_number = ?', (plate_number,))
-    stolen = cursor.fetchone()
-    
-    conn.close()
+    cursor = get_connection().cursor()
+    plate_key = canonical_plate(plate_number)
+    check_stolen = get_hotlist().contains('stolen_plate', plate_key)
     
-    result = {
-        'plate_number': plate_number,
-        'is_registered': vehicle is not None,
-        'is_stolen': stolen is not None,
-        'alert_level': 'CLEAR',
-        'action': 'ALLOW_PASSAGE',
-        'details': {}
-    }
+    # First row wins: with several stolen reports, the earliest one is shown
+    row = _vehicle_check_rows(cursor, [plate_key], check_stolen)[0]
+    return _build_vehicle_result(row, plate_number)
+
+
+def _build_vehicle_result(row, plate_number):
+    """Turn one combined registration/stolen row into a result for the plate as entered"""
+    is_stolen = row['stolen_id'] is not None
+    is_registered = bool(row['is_registered'])
+    is_suspended = is_registered and row['status'] == 'Suspended'
+    alert_level, action, status = VEHICLE_DECISIONS[(is_stolen, is_registered, is_suspended)]
     
-    if stolen:
-        result['alert_level'] = 'CRITICAL'
-        result['action'] = 'DETAIN_IMMEDIATELY'
-        result['details'] = {
-            'status': '🚨 STOLEN VEHICLE',
-            'make_model': f"{stolen[2]} {stolen[3]}",
-            'color': stolen[4],
-            'stolen_date': stolen[5],
-            'stolen_location': stolen[6],
-            'owner': stolen[7],
-            'owner_phone': stolen[8],
-            'case_number': stolen[9]
+    if is_stolen:
+        details = {
+            'status': status,
+            'make_model': f"{row['stolen_make']} {row['stolen_model']}",
+            'color': row['stolen_color'],
+            'stolen_date': row['stolen_date'],
+            'stolen_location': row['stolen_location'],
+            'owner': row['stolen_owner'],
+            'owner_phone': row['stolen_owner_phone'],
+            'case_number': row['case_number']
         }
-    elif not vehicle:
-        result['alert_level'] = 'HIGH'
-        result['action'] = 'DETAILED_INSPECTION'
-        result['details'] = {
-            'status': '⚠️ UNREGISTERED VEHICLE',
+    elif not is_registered:
+        details = {
+            'status': status,
             'issue': 'No registration found in database',
             'recommendation': 'Verify physical documents, possible fake plates'
         }
-    elif vehicle[8] == 'Suspended':
-        result['alert_level'] = 'MEDIUM'
-        result['action'] = 'VERIFY_DOCUMENTS'
-        result['details'] = {
-            'status': '⚠️ SUSPENDED REGISTRATION',
-            'owner': vehicle[1],
-            'phone': vehicle[2],
-            'vehicle': f"{vehicle[3]} {vehicle[4]} ({vehicle[5]})",
-            'registered': vehicle[7],
-            'issue': 'Registration suspended - verify reason'
-        }
     else:
-        result['alert_level'] = 'CLEAR'
-        result['action'] = 'ALLOW_PASSAGE'
-        result['details'] = {
-            'status': '✓ VERIFIED',
-            'owner': vehicle[1],
-            'phone': vehicle[2],
-            'vehicle': f"{vehicle[3]} {vehicle[4]} ({vehicle[5]})",
-            'registered': vehicle[7]
+        details = {
+            'status': status,
+            'owner': row['owner_name'],
+            'phone': row['owner_phone'],
+            'vehicle': f"{row['vehicle_make']} {row['vehicle_model']} ({row['vehicle_color']})",
+            'registered': row['state_registered']
         }
+        if is_suspended:
+            details['issue'] = 'Registration suspended - verify reason'
     
-    return result
+    return {
+        'plate_number': plate_number,
+        'is_registered': is_registered,
+        'is_stolen': is_stolen,
+        'alert_level': alert_level,
+        'action': action,
+        'details': details
+    }
 
 
 # 🔵 TYPE THIS - Person verification (CRITICAL SECURITY)
-def search_wanted_person(name=None, phone=None, bvn=None, nin=None):
+FUZZY_MATCH_THRESHOLD = 0.6   # Share of the query's trigrams a fuzzy match must contain
+FUZZY_CANDIDATES = 50         # Best-ranked index hits to re-score for fuzzy matching
+
+
+_search_indexes = {}  # db_path -> whether the full-text index exists (looked up once)
+
+
+def _has_search_index(cursor, db_path=None):
+    """
+    Check whether the trigram full-text index exists in this database
+    Looked up once per database file, so searches skip the sqlite_master round trip.
+    """
+    db_path = db_path or DATABASE_PATH
+    present = _search_indexes.get(db_path)
+    if present is None:
+        cursor.execute('''
+            SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'wanted_persons_fts'
+        ''')
+        present = _search_indexes[db_path] = cursor.fetchone() is not None
+    return present
+
+
+def _fts_phrase(text):
+    """Quote text as an FTS5 phrase so punctuation is matched literally"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _trigrams(text):
+    """Set of lowercase 3-character substrings"""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _search_index(cursor, columns, text):
+    """Ranked substring search on the trigram index (best matches first)"""
+    cursor.execute('''
+        SELECT wanted_persons.* FROM wanted_persons_fts
+        JOIN wanted_persons ON wanted_persons.id = wanted_persons_fts.rowid
+        WHERE wanted_persons_fts MATCH ?
+        ORDER BY wanted_persons_fts.rank
+    ''', (f'{{{columns}}} : {_fts_phrase(text)}',))
+    return cursor.fetchall()
+
+
+def _fuzzy_name_search(cursor, name):
+    """
+    Find near-miss spellings of a name (e.g. 'Abubaker' for 'Abubakar')
+    The index returns rows sharing any trigram with the name; each candidate is
+    then kept only if it contains enough of the name's trigrams.
+    """
+    query_grams = _trigrams(name)
+    if not query_grams:
+        return []
+
+    any_gram = " OR ".join(_fts_phrase(gram) for gram in sorted(query_grams))
+    cursor.execute('''
+        SELECT wanted_persons.* FROM wanted_persons_fts
+        JOIN wanted_persons ON wanted_persons.id = wanted_persons_fts.rowid
+        WHERE wanted_persons_fts MATCH ?
+        ORDER BY wanted_persons_fts.rank
+        LIMIT ?
+    ''', (f'{{full_name aliases}} : ({any_gram})', FUZZY_CANDIDATES))
+
+    scored = []
+    for row in cursor.fetchall():
+        candidates = [row[1] or ''] + (row[2] or '').split(',')
+        best = max(len(query_grams & _trigrams(c.strip())) / len(query_grams)
+                   for c in candidates)
+        if best >= FUZZY_MATCH_THRESHOLD:
+            scored.append((best, row))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [row for _, row in scored]
+
+
+@checkpoint_metrics.timed('search_wanted_person')
+def search_wanted_person(name=None, phone=None, bvn=None, nin=None, fuzzy=False):
     """
     Search for wanted persons by name, phone, BVN, or NIN
+    Name and phone substrings are served from the trigram index (ranked);
+    fuzzy=True also returns close spellings of the name.
     Returns match results with threat level
     """
-    conn = sqlite3.connect('checkpoint_database.db')
-    cursor = conn.cursor()
-    
+    hotlist = get_hotlist()
+
+    # Exact identifiers missing from the hot list cannot match - skip their queries
+    if bvn and not hotlist.contains('wanted_bvn', bvn):
+        bvn = None
+    if nin and not hotlist.contains('wanted_nin', nin):
+        nin = None
+    phone_key = canonical_phone(phone) if phone else None
+    if phone and is_complete_phone(phone_key) and not hotlist.contains('wanted_phone', phone_key):
+        phone = None
+
     matches = []
-    
+    if not (name or phone or bvn or nin):
+        cursor = None  # Nothing left to ask the database
+    else:
+        cursor = get_connection().cursor()
+        use_index = _has_search_index(cursor) if (name or phone) else False
+
     if name:
-        cursor.execute('''
-            SELECT * FROM wanted_persons 
-            WHERE full_name LIKE ? OR aliases LIKE ?
-        ''', (f'%{name}%', f'%{name}%'))
-        matches.extend(cursor.fetchall())
-    
+        # Exact name or alias (any case, accents or punctuation) - an index probe
+        name_key = fold_name(name)
+        if name_key:
+            cursor.execute('''
+                SELECT wanted_persons.* FROM wanted_aliases
+                JOIN wanted_persons ON wanted_persons.id = wanted_aliases.person_id
+                WHERE wanted_aliases.alias_norm = ?
+                ORDER BY wanted_persons.id
+            ''', (name_key,))
+            matches.extend((row, 'name') for row in cursor.fetchall())
+
+        # Partial names: trigram index needs at least 3 characters, else LIKE
+        if use_index and len(name) >= 3:
+            matches.extend((row, 'name') for row in
+                           _search_index(cursor, 'full_name aliases', name))
+        else:
+            cursor.execute('''
+                SELECT * FROM wanted_persons
+                WHERE full_name LIKE ? OR aliases LIKE ?
+            ''', (f'%{name}%', f'%{name}%'))
+            matches.extend((row, 'name') for row in cursor.fetchall())
+
+        if fuzzy and use_index:
+            matches.extend((row, 'fuzzy_name') for row in _fuzzy_name_search(cursor, name))
+
     if phone:
-        cursor.execute('''
-            SELECT * FROM wanted_persons 
-            WHERE phone_numbers LIKE ?
-        ''', (f'%{phone}%',))
-        matches.extend(cursor.fetchall())
-    
+        if is_complete_phone(phone_key):
+            # Any format of a full number - equality probe on its E.164 form
+            cursor.execute('''
+                SELECT wanted_persons.* FROM wanted_phones
+                JOIN wanted_persons ON wanted_persons.id = wanted_phones.person_id
+                WHERE wanted_phones.phone_e164 = ?
+                ORDER BY wanted_persons.id
+            ''', (phone_key,))
+            matches.extend((row, 'phone') for row in cursor.fetchall())
+        elif use_index and len(phone) >= 3:
+            matches.extend((row, 'phone') for row in
+                           _search_index(cursor, 'phone_numbers', phone))
+        else:
+            cursor.execute('''
+                SELECT * FROM wanted_persons
+                WHERE phone_numbers LIKE ?
+            ''', (f'%{phone}%',))
+            matches.extend((row, 'phone') for row in cursor.fetchall())
+
     if bvn:
         cursor.execute('''
             SELECT * FROM wanted_persons 
             WHERE bvn = ?
         ''', (bvn,))
-        matches.extend(cursor.fetchall())
-    
+        matches.extend((row, 'bvn') for row in cursor.fetchall())
+
     if nin:
         cursor.execute('''
-            SELECT * FROM wanted_persons 
+            SELECT * FROM wanted_persons
             WHERE nin = ?
         ''', (nin,))
-        matches.extend(cursor.fetchall())
-    
-    conn.close()
-    
-    # Remove duplicates
+        matches.extend((row, 'nin') for row in cursor.fetchall())
+
+    return _build_person_result(matches)
+
+
+def _format_reward(amount):
+    """Naira display for a reward; bulk imports store empty cells as NULL"""
+    if amount is None or amount == '':
+        return 'Not stated'
+    if isinstance(amount, (int, float)):
+        return f"₦{amount:,}"
+    return str(amount)  # Free text that SQLite could not store as a number
+
+
+def _build_person_result(matches):
+    """Turn (row, match_type) pairs into a search result, dropping duplicate people"""
+    # Remove duplicates (first - i.e. strongest - match type wins)
     unique_matches = []
     seen_ids = set()
-    for match in matches:
+    for match, match_type in matches:
         if match[0] not in seen_ids:
-            unique_matches.append(match)
+            unique_matches.append((match, match_type))
             seen_ids.add(match[0])
-    
+
     if unique_matches:
+        # Spelling-only matches need identity checks, not an immediate arrest
+        only_fuzzy = all(match_type == 'fuzzy_name' for _, match_type in unique_matches)
         return {
             'found': True,
-            'alert_level': 'CRITICAL',
-            'action': 'ARREST_IMMEDIATELY',
+            'alert_level': 'HIGH' if only_fuzzy else 'CRITICAL',
+            'action': 'VERIFY_IDENTITY' if only_fuzzy else 'ARREST_IMMEDIATELY',
             'matches': [{
                 'name': m[1],
                 'aliases': m[2],
@@ -290,11 +1195,12 @@ def search_wanted_person(name=None, phone=None, bvn=None, nin=None):
                 'crime': m[6],
                 'wanted_level': m[7],
                 'last_seen': m[8],
-                'reward': f"₦{m[9]:,}",
+                'reward': _format_reward(m[9]),
                 'bvn': m[10],
                 'nin': m[11],
-                'phone': m[12]
-            } for m in unique_matches]
+                'phone': m[12],
+                'match_type': match_type
+            } for m, match_type in unique_matches]
         }
     else:
         return {
@@ -305,31 +1211,689 @@ def search_wanted_person(name=None, phone=None, bvn=None, nin=None):
         }
 
 
+# 🔵 Bulk convoy verification (NEW CONCEPT: set-based SQL)
+SQL_CHUNK_SIZE = 500  # Values per IN (...) list - well under SQLite's bound-variable limit
+
+
+def _chunks(values, size=SQL_CHUNK_SIZE):
+    """Split a list into consecutive slices of at most size items"""
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _fetch_in(cursor, sql, values):
+    """Run sql (containing '{placeholders}') once per chunk of values and return all rows"""
+    rows = []
+    for chunk in _chunks(values):
+        placeholders = ','.join('?' * len(chunk))
+        cursor.execute(sql.format(placeholders=placeholders), chunk)
+        rows.extend(cursor.fetchall())
+    return rows
+
+
+@checkpoint_metrics.timed('verify_vehicles', items=len)
+def verify_vehicles(plate_numbers):
+    """
+    Verify a whole convoy of plates in a few round trips
+    Each chunk of plates is one combined registration/stolen query; plates on
+    the stolen hot list and clean plates go in separate queries so clean ones
+    skip the stolen_vehicles probe.
+    Returns one verification result per plate, in input order
+    """
+    cursor = get_connection().cursor()
+    hotlist = get_hotlist()
+    keys = {plate: canonical_plate(plate) for plate in plate_numbers}
+    unique_keys = list(dict.fromkeys(keys.values()))
+    flagged = [key for key in unique_keys if hotlist.contains('stolen_plate', key)]
+    clean = [key for key in unique_keys if not hotlist.contains('stolen_plate', key)]
+
+    rows = {}
+    for plates, check_stolen in ((flagged, True), (clean, False)):
+        for chunk in _chunks(plates):
+            for row in _vehicle_check_rows(cursor, chunk, check_stolen):
+                # Rows come ordered by stolen report id - keep each plate's first
+                rows.setdefault(row['plate_key'], row)
+
+    results = {plate: _build_vehicle_result(rows[key], plate) for plate, key in keys.items()}
+    return [results[plate] for plate in plate_numbers]
+
+
+def _batch_index_search(cursor, columns, texts, column_indexes):
+    """
+    Substring-search many texts with one trigram index query per chunk
+    The combined query returns every row matching any text; each row is then
+    assigned to the texts it actually contains.
+    Returns {text: [rows, best ranked first]}
+    """
+    hits = {text: [] for text in texts}
+    for chunk in _chunks(list(texts)):
+        any_text = " OR ".join(_fts_phrase(text) for text in chunk)
+        cursor.execute('''
+            SELECT wanted_persons.* FROM wanted_persons_fts
+            JOIN wanted_persons ON wanted_persons.id = wanted_persons_fts.rowid
+            WHERE wanted_persons_fts MATCH ?
+            ORDER BY wanted_persons_fts.rank
+        ''', (f'{{{columns}}} : ({any_text})',))
+        rows = cursor.fetchall()
+        for text in chunk:
+            needle = text.lower()
+            hits[text].extend(row for row in rows
+                              if any(needle in (row[i] or '').lower() for i in column_indexes))
+    return hits
+
+
+@checkpoint_metrics.timed('search_wanted_persons', items=len)
+def search_wanted_persons(records):
+    """
+    Screen every passenger of a bus or convoy at once
+    Each record is a dict with optional 'name', 'phone', 'bvn', 'nin' and 'fuzzy'
+    keys (the same arguments as search_wanted_person). BVNs, NINs, full phone
+    numbers and exact names use chunked IN (...) queries; partial names and
+    phones share one index query per chunk.
+    Returns one search result per record, in input order
+    """
+    hotlist = get_hotlist()
+    cursor = get_connection().cursor()
+    use_index = _has_search_index(cursor)
+
+    def batchable(text):
+        return not text or (use_index and len(text) >= 3)
+
+    # Normalise each record the same way search_wanted_person does
+    prepared = []
+    for record in records:
+        name, phone = record.get('name'), record.get('phone')
+        bvn, nin = record.get('bvn'), record.get('nin')
+        if bvn and not hotlist.contains('wanted_bvn', bvn):
+            bvn = None
+        if nin and not hotlist.contains('wanted_nin', nin):
+            nin = None
+        phone_key = canonical_phone(phone) if phone else None
+        if phone and is_complete_phone(phone_key) and not hotlist.contains('wanted_phone', phone_key):
+            phone = None
+        if phone and not is_complete_phone(phone_key):
+            phone_key = None  # Fragment - substring search instead
+        single = record.get('fuzzy') or not (batchable(name) and (phone_key or batchable(phone)))
+        prepared.append((record, single, name, phone, phone_key, bvn, nin))
+
+    batch = [item for item in prepared if not item[1]]
+    names = {item[2] for item in batch if item[2]}
+    phones = {item[3] for item in batch if item[3] and not item[4]}
+    name_keys = list({fold_name(name) for name in names} - {''})
+    phone_keys = list({item[4] for item in batch if item[4]})
+    bvns = list({item[5] for item in batch if item[5]})
+    nins = list({item[6] for item in batch if item[6]})
+
+    name_hits = _batch_index_search(cursor, 'full_name aliases', names, (1, 2)) if names else {}
+    phone_hits = _batch_index_search(cursor, 'phone_numbers', phones, (12,)) if phones else {}
+
+    alias_hits, phone_key_hits, bvn_hits, nin_hits = {}, {}, {}, {}
+    for row in _fetch_in(cursor, '''
+            SELECT wanted_aliases.alias_norm, wanted_persons.* FROM wanted_aliases
+            JOIN wanted_persons ON wanted_persons.id = wanted_aliases.person_id
+            WHERE wanted_aliases.alias_norm IN ({placeholders}) ORDER BY wanted_persons.id
+            ''', name_keys):
+        alias_hits.setdefault(row[0], []).append(row[1:])
+    for row in _fetch_in(cursor, '''
+            SELECT wanted_phones.phone_e164, wanted_persons.* FROM wanted_phones
+            JOIN wanted_persons ON wanted_persons.id = wanted_phones.person_id
+            WHERE wanted_phones.phone_e164 IN ({placeholders}) ORDER BY wanted_persons.id
+            ''', phone_keys):
+        phone_key_hits.setdefault(row[0], []).append(row[1:])
+    for row in _fetch_in(cursor, 'SELECT * FROM wanted_persons WHERE bvn IN ({placeholders}) ORDER BY id', bvns):
+        bvn_hits.setdefault(row[10], []).append(row)
+    for row in _fetch_in(cursor, 'SELECT * FROM wanted_persons WHERE nin IN ({placeholders}) ORDER BY id', nins):
+        nin_hits.setdefault(row[11], []).append(row)
+
+    results = []
+    for record, single, name, phone, phone_key, bvn, nin in prepared:
+        if single:
+            # Fuzzy or very short searches take the one-at-a-time path
+            results.append(search_wanted_person(record.get('name'), record.get('phone'),
+                                                record.get('bvn'), record.get('nin'),
+                                                fuzzy=record.get('fuzzy', False)))
+            continue
+
+        matches = []
+        if name:
+            matches.extend((row, 'name') for row in alias_hits.get(fold_name(name), []))
+        matches.extend((row, 'name') for row in name_hits.get(name, []))
+        if phone_key:
+            matches.extend((row, 'phone') for row in phone_key_hits.get(phone_key, []))
+        else:
+            matches.extend((row, 'phone') for row in phone_hits.get(phone, []))
+        matches.extend((row, 'bvn') for row in bvn_hits.get(bvn, []))
+        matches.extend((row, 'nin') for row in nin_hits.get(nin, []))
+        results.append(_build_person_result(matches))
+
+    return results
+
+
+# 🔵 Partitioned log storage (NEW CONCEPT: time-partitioned tables)
+# Logs live in one table per month (checkpoint_logs_YYYYMM, local time) with
+# integer epoch timestamps. Recent-log queries only touch the newest partitions,
+# and retention drops whole months instead of deleting rows one by one.
+# checkpoint_logs is a view over every partition for ad-hoc reporting. Each
+# partition numbers its own rows, so a row's key is (log_partition, id).
+LOG_PARTITION_PREFIX = 'checkpoint_logs_'
+LOG_PARTITION_GLOB = LOG_PARTITION_PREFIX + '[0-9][0-9][0-9][0-9][0-9][0-9]'
+
+# Row layout of every partition (after the id column)
+LOG_COLUMNS = [
+    'logged_at',            # Unix epoch seconds
+    'checkpoint_name', 'plate_number', 'driver_name', 'passengers',
+    'verification_result', 'action_taken', 'officer_name',
+    'status', 'owner', 'owner_phone', 'vehicle', 'case_number', 'issue',  # From result details
+    'notes',                # Free-text officer notes only
+    'extra',                # JSON of any other result details (stolen_date, recommendation...)
+]
+
+
+def log_partition_for(epoch_seconds):
+    """Partition table name for a timestamp"""
+    return LOG_PARTITION_PREFIX + datetime.fromtimestamp(epoch_seconds).strftime('%Y%m')
+
+
+def list_log_partitions(cursor, newest_first=False):
+    """Names of all log partitions in date order"""
+    cursor.execute(f'''
+        SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?
+        ORDER BY name {'DESC' if newest_first else 'ASC'}
+    ''', (LOG_PARTITION_GLOB,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _rebuild_log_view(cursor):
+    """Point the checkpoint_logs view at the current set of partitions"""
+    columns = ', '.join(['id'] + LOG_COLUMNS)
+    readable_time = "datetime(logged_at, 'unixepoch', 'localtime') AS timestamp"
+    selects = [f"SELECT '{table}' AS log_partition, {columns}, {readable_time} FROM {table}"
+               for table in list_log_partitions(cursor)]
+    if not selects:
+        nulls = ', '.join(f'NULL AS {column}' for column in ['log_partition', 'id'] + LOG_COLUMNS)
+        selects = [f'SELECT {nulls}, NULL AS timestamp WHERE 0']
+    cursor.execute('DROP VIEW IF EXISTS checkpoint_logs')
+    cursor.execute('CREATE VIEW checkpoint_logs AS ' + ' UNION ALL '.join(selects))
+
+
+def ensure_log_partition(cursor, table):
+    """Create a monthly partition (and its indexes) if it does not exist yet"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    if cursor.fetchone():
+        return False
+
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY,
+            logged_at INTEGER NOT NULL,
+            checkpoint_name TEXT,
+            plate_number TEXT,
+            driver_name TEXT,
+            passengers INTEGER,
+            verification_result TEXT,
+            action_taken TEXT,
+            officer_name TEXT,
+            status TEXT,
+            owner TEXT,
+            owner_phone TEXT,
+            vehicle TEXT,
+            case_number TEXT,
+            issue TEXT,
+            notes TEXT,
+            extra TEXT
+        )
+    ''')
+    cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_time ON {table}(logged_at)')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_{table}_checkpoint_time
+        ON {table}(checkpoint_name, logged_at)
+    ''')
+    _rebuild_log_view(cursor)
+    return True
+
+
+def make_log_row(checkpoint_name, plate_number, driver_name, passengers,
+                 verification_result, action_taken, officer_name,
+                 notes="", details=None, logged_at=None):
+    """
+    Build one log row in LOG_COLUMNS order from a verification result's details
+    Details without a column of their own are kept as JSON in extra, so the
+    audit trail never loses a field.
+    """
+    details = details or {}
+    vehicle = details.get('vehicle')
+    if vehicle is None and 'make_model' in details:
+        vehicle = f"{details['make_model']} ({details.get('color')})"
+    mapped = {'status', 'owner', 'vehicle', 'case_number', 'issue',
+              'phone' if 'phone' in details else 'owner_phone'}
+    extra = {key: value for key, value in details.items() if key not in mapped}
+    return (
+        int(time.time() if logged_at is None else logged_at),
+        checkpoint_name, plate_number, driver_name, passengers,
+        verification_result, action_taken, officer_name,
+        details.get('status'), details.get('owner'),
+        details.get('phone', details.get('owner_phone')), vehicle,
+        details.get('case_number'), details.get('issue'),
+        notes or None,
+        json.dumps(extra, default=str) if extra else None,
+    )
+
+
+def insert_log_rows(cursor, rows):
+    """Insert LOG_COLUMNS-ordered rows into their monthly partitions (caller commits)"""
+    by_partition = {}
+    for row in rows:
+        by_partition.setdefault(log_partition_for(row[0]), []).append(row)
+
+    for table, partition_rows in by_partition.items():
+        ensure_log_partition(cursor, table)
+        cursor.executemany(f'''
+            INSERT INTO {table} ({', '.join(LOG_COLUMNS)})
+            VALUES ({', '.join(['?'] * len(LOG_COLUMNS))})
+        ''', partition_rows)
+
+
+def archive_log_partitions(keep_months, archive_path=None, db_path=None):
+    """
+    Retention job: remove partitions older than the newest keep_months months
+    With archive_path, each partition is first copied into that database file
+    (re-running after an interruption re-copies it cleanly). Returns the names
+    of the partitions removed.
+    """
+    if keep_months < 1:
+        raise ValueError("keep_months must be at least 1 (the current month is always kept)")
+
+    flush_checkpoint_logs()
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+
+    today = datetime.now()
+    month_index = today.year * 12 + today.month - 1 - (keep_months - 1)
+    oldest_kept = f"{LOG_PARTITION_PREFIX}{month_index // 12:04d}{month_index % 12 + 1:02d}"
+    expired = [table for table in list_log_partitions(cursor) if table < oldest_kept]
+    if not expired:
+        return []
+
+    if archive_path:
+        cursor.execute('ATTACH DATABASE ? AS archive', (archive_path,))
+    try:
+        for table in expired:
+            cursor.execute('BEGIN')
+            try:
+                if archive_path:
+                    cursor.execute(f'DROP TABLE IF EXISTS archive.{table}')
+                    cursor.execute(f'CREATE TABLE archive.{table} AS SELECT * FROM main.{table}')
+                cursor.execute(f'DROP TABLE main.{table}')
+                _rebuild_log_view(cursor)
+                cursor.execute('COMMIT')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+    finally:
+        if archive_path:
+            cursor.execute('DETACH DATABASE archive')
+
+    return expired
+
+
+# 🔵 Log analytics (NEW CONCEPT: incrementally maintained summaries)
+# Every batch the log writer commits also bumps two small summary tables in
+# the same transaction, so supervisors' dashboards never scan the raw logs:
+#   log_hourly_outcomes   - entries per checkpoint, hour and verification result
+#   flagged_plate_counts  - how often each plate was flagged (anything not CLEAR)
+_LOGGED_AT = LOG_COLUMNS.index('logged_at')
+_CHECKPOINT = LOG_COLUMNS.index('checkpoint_name')
+_PLATE = LOG_COLUMNS.index('plate_number')
+_RESULT = LOG_COLUMNS.index('verification_result')
+
+HOURLY_ON_CONFLICT = '''
+    ON CONFLICT (checkpoint_name, hour_start, verification_result)
+    DO UPDATE SET entries = entries + excluded.entries
+'''
+FLAGGED_ON_CONFLICT = '''
+    ON CONFLICT (plate_key) DO UPDATE SET
+        flag_count = flag_count + excluded.flag_count,
+        last_result = CASE WHEN excluded.last_flagged_at >= last_flagged_at
+                           THEN excluded.last_result ELSE last_result END,
+        last_checkpoint = CASE WHEN excluded.last_flagged_at >= last_flagged_at
+                               THEN excluded.last_checkpoint ELSE last_checkpoint END,
+        last_flagged_at = max(last_flagged_at, excluded.last_flagged_at)
+'''
+HOURLY_UPSERT_SQL = '''
+    INSERT INTO log_hourly_outcomes (checkpoint_name, hour_start, verification_result, entries)
+    VALUES (?, ?, ?, ?)
+''' + HOURLY_ON_CONFLICT
+FLAGGED_UPSERT_SQL = '''
+    INSERT INTO flagged_plate_counts (plate_key, flag_count, last_flagged_at,
+                                      last_result, last_checkpoint)
+    VALUES (?, ?, ?, ?, ?)
+''' + FLAGGED_ON_CONFLICT
+
+
+def update_log_analytics(cursor, rows):
+    """Fold a batch of LOG_COLUMNS-ordered rows into the summary tables (caller commits)"""
+    hourly = {}
+    flagged = {}
+    for row in rows:
+        key = (row[_CHECKPOINT], row[_LOGGED_AT] // 3600 * 3600, row[_RESULT])
+        hourly[key] = hourly.get(key, 0) + 1
+
+        if row[_RESULT] != 'CLEAR' and row[_PLATE]:
+            plate_key = canonical_plate(row[_PLATE])
+            count, last = flagged.get(plate_key, (0, None))
+            if last is None or row[_LOGGED_AT] >= last[_LOGGED_AT]:
+                last = row
+            flagged[plate_key] = (count + 1, last)
+
+    cursor.executemany(HOURLY_UPSERT_SQL, [key + (entries,) for key, entries in hourly.items()])
+    cursor.executemany(FLAGGED_UPSERT_SQL, [
+        (plate_key, count, last[_LOGGED_AT], last[_RESULT], last[_CHECKPOINT])
+        for plate_key, (count, last) in flagged.items()
+    ])
+
+
+def write_log_rows(cursor, rows):
+    """Store log rows and update the analytics summaries (caller commits)"""
+    insert_log_rows(cursor, rows)
+    update_log_analytics(cursor, rows)
+
+
+def rebuild_log_analytics(cursor):
+    """
+    Recompute the summary tables from the raw log partitions (caller commits)
+    Partitions already removed by archive_log_partitions are no longer counted.
+    """
+    cursor.execute('DELETE FROM log_hourly_outcomes')
+    cursor.execute('DELETE FROM flagged_plate_counts')
+    plate_key = PLATE_KEY_SQL.format(column='plate_number')
+    for table in list_log_partitions(cursor):
+        # (WHERE is required before an upsert clause on INSERT ... SELECT)
+        cursor.execute(f'''
+            INSERT INTO log_hourly_outcomes (checkpoint_name, hour_start, verification_result, entries)
+            SELECT checkpoint_name, logged_at / 3600 * 3600, verification_result, COUNT(*)
+            FROM {table} WHERE 1 GROUP BY 1, 2, 3
+        ''' + HOURLY_ON_CONFLICT)
+        # max(logged_at) makes SQLite take the other columns from the newest row
+        cursor.execute(f'''
+            INSERT INTO flagged_plate_counts (plate_key, flag_count, last_flagged_at,
+                                              last_result, last_checkpoint)
+            SELECT {plate_key}, COUNT(*), max(logged_at), verification_result, checkpoint_name
+            FROM {table}
+            WHERE verification_result != 'CLEAR' AND plate_number IS NOT NULL AND plate_number != ''
+            GROUP BY 1
+        ''' + FLAGGED_ON_CONFLICT)
+
+
+def checkpoint_dashboard(checkpoint_name=None, hours=24, top_n=10):
+    """
+    Supervisor summary for the last `hours` hours, read only from the summary tables
+    Returns {'hours', 'totals': {result: entries},
+             'by_checkpoint': {checkpoint: {result: entries}}, 'top_flagged': [...]}
+    """
+    flush_checkpoint_logs()  # Queued entries count too
+    cursor = get_connection().cursor()
+    since = (int(time.time()) // 3600 - hours + 1) * 3600
+
+    if checkpoint_name:
+        cursor.execute('''
+            SELECT checkpoint_name, verification_result, SUM(entries) FROM log_hourly_outcomes
+            WHERE checkpoint_name = ? AND hour_start >= ?
+            GROUP BY 1, 2
+        ''', (checkpoint_name, since))
+    else:
+        cursor.execute('''
+            SELECT checkpoint_name, verification_result, SUM(entries) FROM log_hourly_outcomes
+            WHERE hour_start >= ?
+            GROUP BY 1, 2
+        ''', (since,))
+
+    totals = {}
+    by_checkpoint = {}
+    for name, result, entries in cursor.fetchall():
+        totals[result] = totals.get(result, 0) + entries
+        by_checkpoint.setdefault(name, {})[result] = entries
+
+    cursor.execute('''
+        SELECT plate_key, flag_count, last_flagged_at, last_result, last_checkpoint
+        FROM flagged_plate_counts
+        ORDER BY flag_count DESC, last_flagged_at DESC
+        LIMIT ?
+    ''', (top_n,))
+    top_flagged = [{
+        'plate': plate, 'times_flagged': count,
+        'last_flagged': datetime.fromtimestamp(last_at).strftime('%Y-%m-%d %H:%M:%S'),
+        'last_result': last_result, 'last_checkpoint': last_checkpoint
+    } for plate, count, last_at, last_result, last_checkpoint in cursor.fetchall()]
+
+    return {'hours': hours, 'totals': totals, 'by_checkpoint': by_checkpoint,
+            'top_flagged': top_flagged}
+
+
+# 🔵 Write-behind log writer (NEW CONCEPT: group commit)
+# Durability modes (CHECKPOINT_LOG_DURABILITY):
+#   'group'    - the default: wait until the entry is committed with
+#                synchronous=FULL; concurrent checkpoints share one commit
+#                (and one fsync), so no logged entry is lost in a crash
+#   'buffered' - opt-in: return at once; a background thread commits batches
+#                every LOG_FLUSH_INTERVAL seconds or LOG_BATCH_SIZE entries
+#                (entries still queued are lost if the process is killed or
+#                the power fails)
+#   'direct'   - the original behaviour: one INSERT and COMMIT per entry
+LOG_DURABILITY = os.environ.get('CHECKPOINT_LOG_DURABILITY', 'group')
+LOG_BATCH_SIZE = 256
+LOG_FLUSH_INTERVAL = 0.1  # Seconds
+LOG_RETRY_DELAY = 1.0     # Seconds before buffered entries that failed are retried
+LOG_MAX_ATTEMPTS = 5      # Writes tried per buffered entry before it is dropped (and reported)
+
+_STOP = object()
+
+
+class CheckpointLogWriter:
+    """
+    Queue checkpoint log rows and commit them in batches from one thread
+    Takes the INSERT + COMMIT (and its fsync) off the officer's critical path.
+    """
+
+    def __init__(self, db_path=None, durability=LOG_DURABILITY,
+                 batch_size=LOG_BATCH_SIZE, flush_interval=LOG_FLUSH_INTERVAL):
+        if durability not in ('buffered', 'group', 'direct'):
+            raise ValueError(f"Unknown log durability mode: {durability}")
+        self.db_path = db_path
+        self.durability = durability
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.retry = []  # [row, attempts] of buffered entries whose write failed (writer thread)
+        self.thread = None
+        self.start_lock = threading.Lock()
+        self.closed = False
+
+    def _ensure_started(self):
+        if self.thread is None:
+            with self.start_lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._run, name='checkpoint-log-writer',
+                                                   daemon=True)
+                    self.thread.start()
+
+    def submit(self, row):
+        """Queue one log row (tuple in LOG_COLUMNS order, see make_log_row)"""
+        if self.closed:
+            raise RuntimeError("Checkpoint log writer is closed")
+
+        if self.durability == 'direct':
+            conn = get_connection(self.db_path)
+            with conn:
+                write_log_rows(conn.cursor(), [row])
+            return
+
+        self._ensure_started()
+        if self.durability == 'group':
+            self._wait(row)
+        else:
+            self.queue.put((row, None))
+
+    def _wait(self, row):
+        """Queue row (or a flush marker when None) and block until it is committed"""
+        waiter = {'event': threading.Event(), 'error': None}
+        self.queue.put((row, waiter))
+        waiter['event'].wait()
+        if waiter['error'] is not None:
+            raise waiter['error']
+
+    def flush(self):
+        """Block until everything queued so far has been committed"""
+        if self.thread is not None and self.thread.is_alive():
+            self._wait(None)
+
+    def close(self):
+        """Flush pending entries and stop the writer thread"""
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.closed = True
+            if self.thread is not None and self.thread.is_alive():
+                self.queue.put(_STOP)
+                self.thread.join()
+
+    def _collect_batch(self, first):
+        """Gather more queued items after first, up to the size/time threshold"""
+        batch = [first]
+        if first is _STOP or first[0] is None:
+            return batch
+        # Group mode commits as soon as the queue is drained; buffered mode
+        # also waits up to flush_interval for more entries to share the commit
+        deadline = time.monotonic() + (self.flush_interval if self.durability == 'buffered' else 0)
+        while len(batch) < self.batch_size:
+            item = None
+            try:
+                remaining = deadline - time.monotonic()
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is _STOP or item[0] is None:
+                break  # Stop/flush requests end the batch right away
+        return batch
+
+    def _run(self):
+        conn = get_connection(self.db_path)
+        if self.durability == 'group':
+            conn.execute('PRAGMA synchronous = FULL')
+
+        while True:
+            try:
+                first = self.queue.get(timeout=LOG_RETRY_DELAY if self.retry else None)
+            except queue.Empty:
+                first = (None, None)  # Nothing new: time to retry failed entries
+            batch = self._collect_batch(first)
+            stop = batch[-1] is _STOP
+            if stop:
+                batch.pop()
+
+            # Entries are [row, waiter, attempts]; earlier failures go first
+            entries = [[row, None, attempts] for row, attempts in self.retry]
+            entries += [[row, waiter, 0] for row, waiter in batch if row is not None]
+            self.retry = []
+            errors = self._write_entries(conn, entries) if entries else {}
+
+            last_error = None
+            for index, entry in enumerate(entries):
+                row, waiter, attempts = entry
+                error = errors.get(index)
+                if waiter is not None:
+                    waiter['error'] = error  # Group mode: the caller sees its own failure
+                    waiter['event'].set()
+                elif error is not None:
+                    last_error = error
+                    if attempts + 1 < LOG_MAX_ATTEMPTS and not stop:
+                        self.retry.append([row, attempts + 1])
+                    else:
+                        print(f"\n❌ Checkpoint log entry dropped after {attempts + 1} "
+                              f"attempts: {error}")
+
+            for row, waiter in batch:
+                if row is None and waiter is not None:  # flush(): report what is still unwritten
+                    waiter['error'] = (sqlite3.OperationalError(
+                        f"{len(self.retry)} checkpoint log entries not yet written: {last_error}")
+                        if self.retry else None)
+                    waiter['event'].set()
+
+            if stop:
+                return
+
+    def _write_entries(self, conn, entries):
+        """
+        Commit the entries' rows; returns {entry index: error} for rows not written
+        A failed batch is retried one row per transaction, so a single bad row
+        (or a brief lock) does not take the rest of the batch down with it.
+        Failures are counted as errors of write_log_batch / write_log_row.
+        """
+        rows = [row for row, _, _ in entries]
+        try:
+            with checkpoint_metrics.measure('write_log_batch', len(rows)), conn:
+                write_log_rows(conn.cursor(), rows)  # One transaction per batch
+            return {}
+        except Exception as e:  # The writer thread must survive any bad entry
+            print(f"\n❌ Checkpoint log batch write failed ({len(rows)} entries): {e} "
+                  f"- writing them one by one")
+
+        errors = {}
+        for index, row in enumerate(rows):
+            try:
+                with checkpoint_metrics.measure('write_log_row'), conn:
+                    write_log_rows(conn.cursor(), [row])
+            except Exception as e:
+                errors[index] = e
+        if errors:
+            print(f"\n❌ {len(errors)} checkpoint log entries not written "
+                  f"(buffered entries are retried in {LOG_RETRY_DELAY:g}s)")
+        return errors
+
+
+_log_writers = {}
+_log_writers_lock = threading.Lock()
+
+
+def get_log_writer(db_path=None):
+    """Return the shared log writer for a database (flushed automatically at exit)"""
+    db_path = db_path or DATABASE_PATH
+    writer = _log_writers.get(db_path)
+    if writer is None:
+        with _log_writers_lock:
+            writer = _log_writers.get(db_path)
+            if writer is None:
+                writer = CheckpointLogWriter(db_path)
+                _log_writers[db_path] = writer
+                # Registered after close_connections, so it runs before it at exit
+                atexit.register(writer.close)
+    return writer
+
+
+def flush_checkpoint_logs():
+    """Commit every queued log entry now"""
+    for writer in list(_log_writers.values()):
+        writer.flush()
+
+
 # 🔵 TYPE THIS - Log checkpoint activity
+@checkpoint_metrics.timed('log_checkpoint_activity')
 def log_checkpoint_activity(checkpoint_name, plate_number, driver_name, 
                             passengers, verification_result, action_taken, 
-                            officer_name, notes=""):
+                            officer_name, notes="", details=None):
     """
     Log all checkpoint activities for audit trail
     Critical for accountability and pattern analysis
+    details (a verification result's details) fill the structured columns.
+    Writes go through the shared log writer (see LOG_DURABILITY)
     """
-    conn = sqlite3.connect('checkpoint_database.db')
-    cursor = conn.cursor()
-    
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    row = make_log_row(checkpoint_name, plate_number, driver_name, passengers,
+                       verification_result, action_taken, officer_name, notes, details)
+    get_log_writer().submit(row)
     
-    cursor.execute('''
-        INSERT INTO checkpoint_logs 
-        (checkpoint_name, timestamp, plate_number, driver_name, passengers,
-         verification_result, action_taken, officer_name, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (checkpoint_name, timestamp, plate_number, driver_name, passengers,
-          verification_result, action_taken, officer_name, notes))
-    
-    conn.commit()
-    conn.close()
-    
-    return timestamp
+    return datetime.fromtimestamp(row[0]).strftime('%Y-%m-%d %H:%M:%S')
 
 
 # 🟢 COPY-PASTE OK - Display functions
@@ -381,6 +1945,7 @@ def display_person_search(result):
             print(f"  BVN: {match['bvn']}")
             print(f"  NIN: {match['nin']}")
             print(f"  Phone: {match['phone']}")
+            print(f"  Matched On: {match['match_type'].replace('_', ' ').title()}")
             print()
     else:
         print("✓ No matches found in wanted persons database")
@@ -390,6 +1955,33 @@ def display_person_search(result):
     print("=" * 80)
 
 
+def display_dashboard(dashboard):
+    """Display the supervisor dashboard"""
+    print("\n" + "=" * 80)
+    print(f"📊 SUPERVISOR DASHBOARD - LAST {dashboard['hours']} HOURS")
+    print("=" * 80)
+    print()
+    
+    results = ['CLEAR', 'MEDIUM', 'HIGH', 'CRITICAL']
+    results += sorted(set(dashboard['totals']) - set(results))
+    print(f"{'Checkpoint':40} " + " ".join(f"{r:>9}" for r in results))
+    print("-" * 80)
+    for name, counts in sorted(dashboard['by_checkpoint'].items()):
+        print(f"{name[:40]:40} " + " ".join(f"{counts.get(r, 0):9,}" for r in results))
+    print("-" * 80)
+    print(f"{'TOTAL':40} " + " ".join(f"{dashboard['totals'].get(r, 0):9,}" for r in results))
+    print()
+    
+    print("Most flagged plates (all time):")
+    if not dashboard['top_flagged']:
+        print("  None")
+    for plate in dashboard['top_flagged']:
+        print(f"  {plate['plate']:12} flagged {plate['times_flagged']:,}x | "
+              f"last {plate['last_result']} at {plate['last_checkpoint']} ({plate['last_flagged']})")
+    
+    print("=" * 80)
+
+
 # 🔵 TYPE THIS - Main checkpoint interface
 def checkpoint_interface():
     """
@@ -435,6 +2027,7 @@ def checkpoint_interface():
         print("2. Search Wanted Person")
         print("3. View Checkpoint Logs")
         print("4. Exit/Change Checkpoint")
+        print("5. Verify Convoy (multiple vehicles)")
         
         choice = input("\nSelect operation: ").strip()
         
@@ -452,7 +2045,7 @@ def checkpoint_interface():
             log_checkpoint_activity(
                 checkpoint_name, plate, driver, passengers,
                 result['alert_level'], result['action'], officer_name,
-                json.dumps(result['details'])
+                details=result['details']
             )
             
             print(f"\n✓ Activity logged")
@@ -489,44 +2082,83 @@ def checkpoint_interface():
         elif choice == '4':
             print("\n✓ Checkpoint session ended")
             break
+            
+        elif choice == '5':
+            # Convoy verification - all plates checked in one batch
+            plates_input = input("\nEnter plate numbers (comma-separated): ")
+            plates = [p.strip().upper() for p in plates_input.split(',') if p.strip()]
+            
+            print(f"\nVerifying {len(plates)} vehicles...")
+            results = verify_vehicles(plates)
+            for result in results:
+                display_vehicle_verification(result)
+                log_checkpoint_activity(
+                    checkpoint_name, result['plate_number'], '', '',
+                    result['alert_level'], result['action'], officer_name,
+                    details=result['details']
+                )
+            
+            flagged = [r for r in results if r['alert_level'] != 'CLEAR']
+            print(f"\n✓ {len(results)} vehicles logged - {len(flagged)} flagged")
+            
         else:
             print("\n⚠️ Invalid choice")
 
 
-def view_checkpoint_logs(checkpoint_name=None, limit=10):
-    """View recent checkpoint activities"""
-    conn = sqlite3.connect('checkpoint_database.db')
-    cursor = conn.cursor()
+def recent_checkpoint_logs(checkpoint_name=None, limit=10):
+    """
+    Newest log rows first, as sqlite3.Row objects keyed by (log_partition, id)
+    Walks the monthly partitions from the newest and stops once limit rows are found
+    """
+    flush_checkpoint_logs()  # Make sure queued entries are visible
+    cursor = get_connection().cursor()
+    cursor.row_factory = sqlite3.Row
     
-    if checkpoint_name:
-        cursor.execute('''
-            SELECT * FROM checkpoint_logs 
-            WHERE checkpoint_name = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        ''', (checkpoint_name, limit))
-    else:
-        cursor.execute('''
-            SELECT * FROM checkpoint_logs 
-            ORDER BY timestamp DESC
-            LIMIT ?
-        ''', (limit,))
+    logs = []
+    for table in list_log_partitions(cursor, newest_first=True):
+        if checkpoint_name:
+            cursor.execute(f'''
+                SELECT '{table}' AS log_partition, * FROM {table}
+                WHERE checkpoint_name = ?
+                ORDER BY logged_at DESC, id DESC
+                LIMIT ?
+            ''', (checkpoint_name, limit - len(logs)))
+        else:
+            cursor.execute(f'''
+                SELECT '{table}' AS log_partition, * FROM {table}
+                ORDER BY logged_at DESC, id DESC
+                LIMIT ?
+            ''', (limit - len(logs),))
+        logs.extend(cursor.fetchall())
+        if len(logs) >= limit:
+            break
     
-    logs = cursor.fetchall()
-    conn.close()
+    return logs
+
+
+def view_checkpoint_logs(checkpoint_name=None, limit=10):
+    """View recent checkpoint activities"""
+    logs = recent_checkpoint_logs(checkpoint_name, limit)
+    totals = checkpoint_dashboard(checkpoint_name, hours=24, top_n=0)['totals']
     
     print("\n" + "=" * 80)
     print("📋 CHECKPOINT ACTIVITY LOGS")
     print("=" * 80)
     print()
     
+    summary = " | ".join(f"{result}: {count:,}" for result, count in sorted(totals.items()))
+    print(f"Last 24 hours: {summary or 'no activity'}")
+    print("-" * 80)
+    
     if logs:
         for log in logs:
-            print(f"Time: {log[2]}")
-            print(f"Checkpoint: {log[1]}")
-            print(f"Vehicle: {log[3]} | Driver: {log[4]} | Passengers: {log[5]}")
-            print(f"Result: {log[6]} | Action: {log[7]}")
-            print(f"Officer: {log[8]}")
+            logged_at = datetime.fromtimestamp(log['logged_at']).strftime('%Y-%m-%d %H:%M:%S')
+            print(f"Time: {logged_at}")
+            print(f"Checkpoint: {log['checkpoint_name']}")
+            print(f"Vehicle: {log['plate_number']} | Driver: {log['driver_name']} | "
+                  f"Passengers: {log['passengers']}")
+            print(f"Result: {log['verification_result']} | Action: {log['action_taken']}")
+            print(f"Officer: {log['officer_name']}")
             print("-" * 80)
     else:
         print("No logs found")
@@ -550,6 +2182,7 @@ def main():
         print("3. Test Vehicle Verification")
         print("4. Test Person Search")
         print("5. Exit System")
+        print("6. Supervisor Dashboard")
         
         choice = input("\nSelect option: ").strip()
         
@@ -571,6 +2204,8 @@ def main():
         elif choice == '5':
             print("\n✓ System shutdown")
             break
+        elif choice == '6':
+            display_dashboard(checkpoint_dashboard())
         else:
             print("\n⚠️ Invalid choice")
 
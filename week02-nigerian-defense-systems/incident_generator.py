@@ -0,0 +1,259 @@
+"""
+Synthetic Incident Generator - Load Testing Tool
+Defense Application: Benchmark the crime pattern analyzer at national scale
+Generates tens of millions of realistic, reproducible incidents in vectorised chunks
+and writes them straight to the analyzer's streaming input formats (.jsonl / .csv)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from crime_pattern_analyzer import INCIDENT_FIELDS
+
+# Fixed so that --seed alone reproduces a dataset on any day (override with --end-date)
+DEFAULT_END_DATE = '2024-12-31'
+
+# 🔵 Default distributions (relative weights - they do not need to sum to 1)
+DEFAULT_STATE_WEIGHTS = {
+    # High-risk states
+    'Zamfara': 3, 'Kaduna': 3, 'Katsina': 3, 'Niger': 3, 'Plateau': 3,
+    # Medium-risk states
+    'Borno': 2, 'Yobe': 2, 'Adamawa': 2, 'Taraba': 2, 'Benue': 2,
+    # Lower-risk states
+    'FCT': 1, 'Kano': 1, 'Sokoto': 1, 'Kebbi': 1, 'Nasarawa': 1,
+}
+
+DEFAULT_LGAS = {
+    'Zamfara': ['Anka', 'Maru', 'Gusau', 'Tsafe', 'Bungudu'],
+    'Kaduna': ['Birnin Gwari', 'Chikun', 'Giwa', 'Igabi', 'Kaduna North'],
+    'Katsina': ['Jibia', 'Batsari', 'Safana', 'Dandume', 'Faskari'],
+    'Niger': ['Shiroro', 'Munya', 'Rafi', 'Mariga', 'Mashegu'],
+    'Plateau': ['Barkin Ladi', 'Riyom', 'Jos South', 'Bassa', 'Mangu'],
+    'Borno': ['Maiduguri', 'Bama', 'Gwoza', 'Konduga', 'Dikwa'],
+    'Yobe': ['Damaturu', 'Potiskum', 'Geidam', 'Gujba', 'Yunusari'],
+    'Adamawa': ['Yola North', 'Mubi North', 'Madagali', 'Michika', 'Hong'],
+    'Taraba': ['Jalingo', 'Wukari', 'Takum', 'Ibi', 'Donga'],
+    'Benue': ['Makurdi', 'Guma', 'Agatu', 'Logo', 'Gwer West'],
+    'FCT': ['AMAC', 'Bwari', 'Kuje', 'Gwagwalada', 'Abaji'],
+    'Kano': ['Kano Municipal', 'Fagge', 'Dala', 'Gwale', 'Tarauni'],
+    'Sokoto': ['Sabon Birni', 'Isa', 'Goronyo', 'Rabah', 'Wurno'],
+    'Kebbi': ['Danko Wasagu', 'Zuru', 'Sakaba', 'Shanga', 'Argungu'],
+    'Nasarawa': ['Lafia', 'Keffi', 'Akwanga', 'Doma', 'Awe'],
+}
+
+DEFAULT_CRIME_TYPE_WEIGHTS = {
+    'Kidnapping': 3, 'Banditry': 3, 'Armed Robbery': 2,
+    'Cattle Rustling': 2, 'Terrorism': 1, 'Communal Clash': 1,
+}
+
+# Attacks cluster at night and early morning
+DEFAULT_HOUR_WEIGHTS = [
+    4, 4, 4, 4, 3, 3,   # 00-05
+    2, 2, 1, 1, 1, 1,   # 06-11
+    1, 1, 1, 1, 2, 2,   # 12-17
+    3, 3, 3, 4, 4, 4,   # 18-23
+]
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+MAX_CASUALTIES = 15
+
+
+def _normalise(weights):
+    """Turn relative weights into probabilities"""
+    weights = np.asarray(weights, dtype=float)
+    if weights.ndim != 1 or len(weights) == 0 or (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError("Weights must be a non-empty list of non-negative numbers")
+    return weights / weights.sum()
+
+
+def load_config(path=None):
+    """
+    Build the generator configuration, optionally overriding defaults from a JSON file
+    Keys: states {name: weight}, lgas {state: [names] or {name: weight}},
+          crime_types {name: weight}, hours [24 weights]
+    """
+    config = {
+        'states': dict(DEFAULT_STATE_WEIGHTS),
+        'lgas': {state: list(lgas) for state, lgas in DEFAULT_LGAS.items()},
+        'crime_types': dict(DEFAULT_CRIME_TYPE_WEIGHTS),
+        'hours': list(DEFAULT_HOUR_WEIGHTS),
+    }
+    if path:
+        with open(path, encoding='utf-8') as f:
+            config.update(json.load(f))
+
+    if len(config['hours']) != 24:
+        raise ValueError("'hours' must contain exactly 24 weights")
+    return config
+
+
+class IncidentGenerator:
+    """
+    Vectorised incident generator
+    Every column is drawn for a whole chunk at once with numpy, and all string
+    values are pre-encoded once so writing a row is just a template fill
+    """
+
+    def __init__(self, config, seed=42, days=365, end_date=DEFAULT_END_DATE):
+        self.rng = np.random.default_rng(seed)
+        self.days = days
+        self.end_day = np.datetime64(end_date, 'D')
+
+        self.states = list(config['states'])
+        self.state_p = _normalise(list(config['states'].values()))
+
+        # Flatten (state, lga) pairs into one table; per-state probabilities index into it
+        self.lga_names = []
+        self.lga_offsets = []
+        self.lga_p = []
+        for state in self.states:
+            lgas = config['lgas'].get(state) or ['Unknown LGA']
+            if isinstance(lgas, dict):
+                names, weights = list(lgas), list(lgas.values())
+            else:
+                names, weights = list(lgas), [1] * len(lgas)
+            self.lga_offsets.append(len(self.lga_names))
+            self.lga_names.extend(names)
+            self.lga_p.append(_normalise(weights))
+
+        self.crime_types = list(config['crime_types'])
+        self.crime_p = _normalise(list(config['crime_types'].values()))
+        self.hour_p = _normalise(config['hours'])
+
+    def generate_chunk(self, size):
+        """Draw one chunk of incidents as parallel numpy columns"""
+        rng = self.rng
+
+        state_idx = rng.choice(len(self.states), size=size, p=self.state_p)
+
+        # LGA depends on state: draw per state for the rows that landed there
+        lga_idx = np.empty(size, dtype=np.int64)
+        for i, p in enumerate(self.lga_p):
+            mask = state_idx == i
+            count = int(mask.sum())
+            if count:
+                lga_idx[mask] = self.lga_offsets[i] + rng.choice(len(p), size=count, p=p)
+
+        days_ago = rng.integers(0, self.days + 1, size=size)
+        dates = self.end_day - days_ago
+        # 1970-01-01 was a Thursday (index 3 with Monday = 0)
+        weekday = (dates.astype(np.int64) + 3) % 7
+
+        return {
+            'state': state_idx,
+            'lga': lga_idx,
+            'type': rng.choice(len(self.crime_types), size=size, p=self.crime_p),
+            'hour': rng.choice(24, size=size, p=self.hour_p),
+            'day_of_week': weekday,
+            'casualties': rng.integers(0, MAX_CASUALTIES + 1, size=size),
+            'date': dates.astype(str),
+        }
+
+    def iter_chunks(self, count, chunk_size=1_000_000):
+        """Yield chunks until count incidents have been generated"""
+        remaining = count
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            yield self.generate_chunk(size)
+            remaining -= size
+
+
+def _write_jsonl(out, chunk, lookups):
+    states, lgas, types, days = lookups
+    template = ('{{"state": {}, "lga": {}, "type": {}, "hour": {}, '
+                '"day_of_week": {}, "casualties": {}, "date": "{}"}}\n')
+    out.writelines(
+        template.format(states[s], lgas[l], types[t], h, days[d], c, dt)
+        for s, l, t, h, d, c, dt in zip(
+            chunk['state'].tolist(), chunk['lga'].tolist(), chunk['type'].tolist(),
+            chunk['hour'].tolist(), chunk['day_of_week'].tolist(),
+            chunk['casualties'].tolist(), chunk['date'].tolist())
+    )
+
+
+def _write_csv(out, chunk, lookups):
+    states, lgas, types, days = lookups
+    out.writelines(
+        f"{states[s]},{lgas[l]},{types[t]},{h},{days[d]},{c},{dt}\n"
+        for s, l, t, h, d, c, dt in zip(
+            chunk['state'].tolist(), chunk['lga'].tolist(), chunk['type'].tolist(),
+            chunk['hour'].tolist(), chunk['day_of_week'].tolist(),
+            chunk['casualties'].tolist(), chunk['date'].tolist())
+    )
+
+
+def _csv_field(value):
+    """Quote a CSV field only when it needs it"""
+    if any(ch in value for ch in ',"\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def write_incidents(generator, count, filename, chunk_size=1_000_000):
+    """
+    Generate count incidents and write them to a .jsonl or .csv file
+    Returns the number of rows written
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.jsonl':
+        encode, writer = json.dumps, _write_jsonl
+    elif extension == '.csv':
+        encode, writer = _csv_field, _write_csv
+    else:
+        raise ValueError(f"Unsupported output format: {filename} (use .jsonl or .csv)")
+
+    # Encode every categorical value once instead of once per row
+    lookups = (
+        [encode(name) for name in generator.states],
+        [encode(name) for name in generator.lga_names],
+        [encode(name) for name in generator.crime_types],
+        [encode(name) for name in DAYS],
+    )
+
+    written = 0
+    with open(filename, 'w', encoding='utf-8', newline='') as out:
+        if extension == '.csv':
+            out.write(",".join(INCIDENT_FIELDS) + "\n")
+        for chunk in generator.iter_chunks(count, chunk_size):
+            writer(out, chunk, lookups)
+            written += len(chunk['state'])
+            print(f"\rGenerated {written:,}/{count:,} incidents...", end="", file=sys.stderr)
+    print(file=sys.stderr)
+
+    return written
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Generate synthetic incidents for load testing")
+    parser.add_argument('--count', type=int, default=1_000_000, help="number of incidents")
+    parser.add_argument('--output', default='synthetic_incidents.jsonl',
+                        help="output file (.jsonl or .csv)")
+    parser.add_argument('--seed', type=int, default=42, help="random seed for reproducibility")
+    parser.add_argument('--config', help="JSON file overriding state/LGA/crime/hour weights")
+    parser.add_argument('--days', type=int, default=365, help="date range in days")
+    parser.add_argument('--end-date', default=DEFAULT_END_DATE,
+                        help=f"last incident date (YYYY-MM-DD), default {DEFAULT_END_DATE}")
+    parser.add_argument('--chunk-size', type=int, default=1_000_000, help="rows per vectorised chunk")
+    args = parser.parse_args(argv)
+
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d').date()
+    generator = IncidentGenerator(load_config(args.config), args.seed, args.days, end_date)
+
+    start = time.perf_counter()
+    written = write_incidents(generator, args.count, args.output, args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"✓ Wrote {written:,} incidents to {args.output} "
+          f"in {elapsed:.1f}s ({written / elapsed:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
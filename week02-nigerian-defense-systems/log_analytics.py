@@ -0,0 +1,51 @@
+"""
+Checkpoint Analytics - Supervisor Dashboard
+Defense Application: Outcome counts and repeat-offender plates across checkpoints
+Reads the incrementally maintained summary tables; --rebuild recomputes them from raw logs
+"""
+
+import argparse
+import sys
+import time
+
+import checkpoint_system
+
+
+def rebuild(db_path=None):
+    """Recompute the analytics summary tables from every log partition"""
+    checkpoint_system.flush_checkpoint_logs()
+    conn = checkpoint_system.get_connection(db_path)
+    start = time.perf_counter()
+    cursor = conn.cursor()
+    cursor.execute('BEGIN')
+    try:
+        checkpoint_system.rebuild_log_analytics(cursor)
+        cursor.execute('COMMIT')
+    except Exception:
+        cursor.execute('ROLLBACK')
+        raise
+    print(f"✓ Analytics rebuilt from raw logs in {time.perf_counter() - start:.1f}s")
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Checkpoint supervisor dashboard")
+    parser.add_argument('--checkpoint', help="only this checkpoint")
+    parser.add_argument('--hours', type=int, default=24, help="time window in hours")
+    parser.add_argument('--top', type=int, default=10, help="most flagged plates to show")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="recompute the summary tables from the raw logs first")
+    args = parser.parse_args(argv)
+
+    conn = checkpoint_system.get_connection()
+    checkpoint_system.migrate_database(conn)
+    if args.rebuild:
+        rebuild()
+
+    dashboard = checkpoint_system.checkpoint_dashboard(args.checkpoint, args.hours, args.top)
+    checkpoint_system.display_dashboard(dashboard)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Log Retention Job - Checkpoint System
+Defense Application: Keep years of checkpoint traffic without slowing the posts
+Archives and removes monthly checkpoint log partitions past the retention window
+"""
+
+import argparse
+import sys
+
+import checkpoint_system
+
+DEFAULT_KEEP_MONTHS = 12
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Archive old checkpoint log partitions")
+    parser.add_argument('--keep-months', type=int, default=DEFAULT_KEEP_MONTHS,
+                        help="months of logs to keep online, including the current one")
+    parser.add_argument('--archive', help="database file that receives expired partitions "
+                                          "(omit to delete them)")
+    parser.add_argument('--list', action='store_true', help="list partitions and row counts only")
+    args = parser.parse_args(argv)
+
+    conn = checkpoint_system.get_connection()
+    checkpoint_system.migrate_database(conn)
+    cursor = conn.cursor()
+
+    if args.list:
+        for table in checkpoint_system.list_log_partitions(cursor):
+            count = cursor.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            print(f"{table}: {count:,} entries")
+        return 0
+
+    try:
+        removed = checkpoint_system.archive_log_partitions(args.keep_months, args.archive)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    if not removed:
+        print(f"✓ Nothing older than {args.keep_months} months")
+    for table in removed:
+        destination = f"archived to {args.archive}" if args.archive else "deleted"
+        print(f"✓ {table} {destination}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())